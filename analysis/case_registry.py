@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+CASE REGISTRY — CASES.md AS A QUERYABLE INDEX
+
+Compiles the markdown tables in CASES.md (the four mechanisms, the
+cases by domain and the community submissions) into case records with
+inverted indexes on mechanism, domain, entity and status, plus an
+interval index on the date ranges. A query such as
+
+    --mechanism 4 --mechanism 2 --domain energy --status verified
+    --active 2000
+
+intersects the postings of each condition (smallest first) and checks
+the date intervals from a start-sorted list, so nothing is re-parsed to
+answer it.
+
+Date ranges are read as year intervals: "1977-2000s" is 1977-2009,
+"1960s-2017" is 1960-2017 and "present" leaves the interval open.
+
+The parsed sections are cached as JSON next to the other caches. The
+file is split at its headings and each section is keyed by a hash of
+its text, so after an edit (a new community submission, say) only the
+sections whose text changed are parsed again; an unchanged file
+(same size and mtime) is not read at all.
+
+Usage:
+    python case_registry.py --mechanism 4 --mechanism 2 --domain energy \\
+        --status verified --active 2000
+    python case_registry.py --entity dupont -o csv
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from bisect import bisect_right
+from collections import defaultdict
+
+import column_cache
+import report_writer
+from entity_names import normalize
+
+REGISTRY_VERSION = 1
+
+# Table column heading -> case field (CASES.md and CONTRIBUTE.md names)
+COLUMNS = {
+    "id": "id",
+    "case id": "id",
+    "domain": "domain",
+    "subject": "subject",
+    "primary entity": "entity",
+    "target": "target",
+    "mechanisms": "mechanisms",
+    "mechanisms used": "mechanisms",
+    "date range": "date_range",
+    "impact": "impact",
+    "estimated impact": "impact",
+    "key sources": "sources",
+    "submitted by": "submitted_by",
+    "status": "status",
+}
+MECHANISMS_SECTION = "The Four Mechanisms"
+COMMUNITY_SECTION = "Community Submissions"
+
+_HEADING_RE = re.compile(r"^(#{2,3})\s+(.*?)\s*$")
+_CELL_SPLIT_RE = re.compile(r"(?<!\\)\|")
+_YEAR_RE = re.compile(r"(\d{4})(s?)")
+
+
+def default_cases_path():
+    here = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(here, "..", "CASES.md")
+
+
+def parse_date_range(text):
+    """
+    Return (start, end) years for a date range; end is None for
+    "present". Decades cover all their years. Either side is None if
+    it cannot be read.
+    """
+    left, _, right = text.partition("-")
+    right = right or left
+
+    def year(part, last):
+        m = _YEAR_RE.search(part)
+        if not m:
+            return None
+        value = int(m.group(1))
+        return value + 9 if last and m.group(2) else value
+
+    if right.strip().lower() == "present":
+        return year(left, False), None
+    return year(left, False), year(right, True)
+
+
+def split_sections(text):
+    """
+    Split markdown at ## and ### headings.
+
+    Returns [(key, heading, parent, body)] in document order. key is
+    the heading path, made unique by a counter if it repeats.
+    """
+    sections = []
+    seen = defaultdict(int)
+    heading, parent, body = "", "", []
+    current = ""
+
+    def close():
+        key = f"{parent} / {heading}" if parent else heading
+        seen[key] += 1
+        if seen[key] > 1:
+            key = f"{key} #{seen[key]}"
+        sections.append((key, heading, parent, "".join(body)))
+
+    for line in text.splitlines(keepends=True):
+        m = _HEADING_RE.match(line)
+        if m:
+            close()
+            level, heading = len(m.group(1)), m.group(2)
+            if level == 2:
+                current = heading
+                parent = ""
+            else:
+                parent = current
+            body = []
+        else:
+            body.append(line)
+    close()
+    return sections
+
+
+def _cells(line):
+    cells = _CELL_SPLIT_RE.split(line.strip())
+    if cells and not cells[0].strip():
+        cells = cells[1:]
+    if cells and not cells[-1].strip():
+        cells = cells[:-1]
+    return [c.strip().replace("\\|", "|") for c in cells]
+
+
+def parse_tables(body):
+    """Yield each markdown table in body as (header, rows of cells)."""
+    header, rows = None, []
+    for line in body.splitlines():
+        if not line.lstrip().startswith("|"):
+            if header is not None:
+                yield header, rows
+            header, rows = None, []
+            continue
+        cells = _cells(line)
+        if header is None:
+            header = cells
+        elif all(set(c) <= set("-: ") for c in cells):
+            continue  # delimiter row
+        else:
+            rows.append(cells)
+    if header is not None:
+        yield header, rows
+
+
+def parse_section(heading, parent, body):
+    """
+    Parse one section. Returns {"cases": [...], "mechanisms": {...}}.
+
+    Rows with an empty first cell (the placeholder row of the community
+    table) are skipped.
+    """
+    parsed = {"cases": [], "mechanisms": {}}
+    for header, rows in parse_tables(body):
+        names = [h.lower() for h in header]
+        if heading == MECHANISMS_SECTION:
+            for row in rows:
+                if row and row[0].isdigit() and len(row) > 1:
+                    parsed["mechanisms"][row[0]] = row[1]
+            continue
+        if "id" not in names and "case id" not in names:
+            continue
+        fields = [COLUMNS.get(n, re.sub(r"\W+", "_", n)) for n in names]
+        for row in rows:
+            if not row or not row[0]:
+                continue
+            case = dict(zip(fields, row))
+            case["section"] = heading
+            if parent:
+                case.setdefault("domain", heading)
+            case["mechanisms"] = [int(m) for m in re.findall(
+                r"\d+", case.get("mechanisms", ""))]
+            case["start"], case["end"] = parse_date_range(
+                case.get("date_range", ""))
+            parsed["cases"].append(case)
+    return parsed
+
+
+def _section_digest(key, body):
+    return hashlib.sha256(f"{key}\n{body}".encode("utf-8")).hexdigest()
+
+
+class CaseRegistry:
+    """
+    Cases with inverted indexes.
+
+    Index keys are lowercase: mechanism numbers, domain names and each
+    part of a "/"-joined domain ("finance / industry", "finance",
+    "industry"), entity words as produced by entity_names.normalize,
+    and statuses.
+    """
+
+    def __init__(self, cases, mechanisms=None):
+        self.cases = cases
+        self.mechanisms = mechanisms or {}
+        self.by_mechanism = defaultdict(set)
+        self.by_domain = defaultdict(set)
+        self.by_entity = defaultdict(set)
+        self.by_status = defaultdict(set)
+
+        # community rows without a Domain column take the domain of
+        # their ID prefix (XX.N) from the curated tables
+        codes = {}
+        for case in cases:
+            if case.get("domain") and "." in case["id"]:
+                codes.setdefault(case["id"].split(".")[0], case["domain"])
+
+        for i, case in enumerate(cases):
+            if not case.get("domain"):
+                case["domain"] = codes.get(case["id"].split(".")[0], "")
+            for m in case["mechanisms"]:
+                self.by_mechanism[m].add(i)
+            domain = case["domain"].lower()
+            if domain:
+                self.by_domain[domain].add(i)
+                for part in domain.split("/"):
+                    self.by_domain[part.strip()].add(i)
+            for word in normalize(case.get("entity", "")).split():
+                self.by_entity[word].add(i)
+            status = case.get("status", "").lower()
+            if status:
+                self.by_status[status].add(i)
+
+        # (start, end, position) sorted by start; open ends never close
+        self._intervals = sorted(
+            (c["start"], c["end"] if c["end"] is not None else float("inf"),
+             i) for i, c in enumerate(cases) if c["start"] is not None)
+        self._starts = [s for s, _, _ in self._intervals]
+
+    def active(self, start, end=None):
+        """Return positions of cases whose date range overlaps start..end."""
+        if end is None:
+            end = start
+        last = bisect_right(self._starts, end)
+        return {i for _, stop, i in self._intervals[:last] if stop >= start}
+
+    def query(self, mechanisms=(), domain=None, entity=None, status=None,
+              active=None):
+        """
+        Return the cases matching every given condition, in document
+        order. mechanisms must all be present; entity matches cases
+        whose entity contains every word; active is a year or a
+        (start, end) pair.
+        """
+        postings = [self.by_mechanism.get(int(m), set())
+                    for m in mechanisms]
+        if domain:
+            postings.append(self.by_domain.get(domain.lower().strip(),
+                                               set()))
+        if entity:
+            postings.extend(self.by_entity.get(word, set())
+                            for word in normalize(entity).split())
+        if status:
+            postings.append(self.by_status.get(status.lower().strip(),
+                                               set()))
+        if active is not None:
+            start, end = (active if isinstance(active, tuple)
+                          else (active, active))
+            postings.append(self.active(start, end))
+
+        if not postings:
+            return list(self.cases)
+        postings.sort(key=len)
+        hits = set(postings[0])
+        for posting in postings[1:]:
+            hits &= posting
+            if not hits:
+                break
+        return [self.cases[i] for i in sorted(hits)]
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("version") == REGISTRY_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _save_cache(cache_path, cache):
+    directory = os.path.dirname(os.path.abspath(cache_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_registry(cases_path=None, cache_path=None):
+    """
+    Return (registry, sections_parsed) for cases_path, updating the
+    cache at cache_path (default: under the cache directory).
+    """
+    if cases_path is None:
+        cases_path = default_cases_path()
+    if cache_path is None:
+        cache_path = column_cache.cache_path_for(
+            cases_path, "case-registry", suffix=".json")
+
+    st = os.stat(cases_path)
+    cache = _load_cache(cache_path)
+    parsed_count = 0
+    if cache is None or cache["size"] != st.st_size or \
+            cache["mtime_ns"] != st.st_mtime_ns:
+        with open(cases_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        old = {s["key"]: s for s in cache["sections"]} if cache else {}
+        sections = []
+        for key, heading, parent, body in split_sections(text):
+            digest = _section_digest(key, body)
+            section = old.get(key)
+            if section is None or section["sha256"] != digest:
+                section = dict(parse_section(heading, parent, body),
+                               key=key, sha256=digest)
+                parsed_count += 1
+            sections.append(section)
+        cache = {"version": REGISTRY_VERSION, "size": st.st_size,
+                 "mtime_ns": st.st_mtime_ns, "sections": sections}
+        _save_cache(cache_path, cache)
+
+    cases = []
+    mechanisms = {}
+    for section in cache["sections"]:
+        cases.extend(dict(c) for c in section["cases"])
+        mechanisms.update(section["mechanisms"])
+    return CaseRegistry(cases, mechanisms), parsed_count
+
+
+CASE_HEADER = ("id", "domain", "subject", "entity", "mechanisms",
+               "date_range", "status")
+
+
+def case_rows(cases):
+    for c in cases:
+        yield (c["id"], c["domain"], c.get("subject", ""),
+               c.get("entity", ""), ", ".join(map(str, c["mechanisms"])),
+               c.get("date_range", ""), c.get("status", ""))
+
+
+def _year_span(text):
+    start, _, end = text.partition("-")
+    if not start.isdigit() or (end and not end.isdigit()):
+        raise ValueError(f"expected YEAR or START-END, got {text!r}")
+    return (int(start), int(end or start))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query the cases in CASES.md by mechanism, domain, "
+                    "entity, status and active years."
+    )
+    parser.add_argument(
+        "--file", "-f",
+        type=str,
+        default=None,
+        help="Path to CASES.md (default: the one in the repository root)"
+    )
+    parser.add_argument(
+        "--mechanism", "-m",
+        type=int,
+        action="append",
+        default=[],
+        help="Mechanism number (1-4) the case must use. May be repeated; "
+             "all must match"
+    )
+    parser.add_argument("--domain", "-d", default=None,
+                        help="Domain, e.g. energy or pharmaceutical")
+    parser.add_argument("--entity", "-e", default=None,
+                        help="Words of the primary entity, e.g. dupont")
+    parser.add_argument("--status", "-s", default=None,
+                        help="Status, e.g. verified or 'under review'")
+    parser.add_argument(
+        "--active", "-a",
+        type=str,
+        default=None,
+        metavar="YEAR[-YEAR]",
+        help="Only cases whose date range overlaps these years"
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        help="Registry cache file (default: under $AETHER_CACHE_DIR)"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        choices=report_writer.FORMATS,
+        default="text",
+        help="Output format: text (default), csv, jsonl, or binary"
+    )
+
+    args = parser.parse_args()
+
+    if args.output == "binary" and sys.stdout.isatty():
+        parser.error("--output binary writes binary data; redirect stdout")
+    try:
+        active = _year_span(args.active) if args.active else None
+    except ValueError as e:
+        parser.error(str(e))
+    cases_path = args.file or default_cases_path()
+    if not os.path.exists(cases_path):
+        print(f"ERROR: Cannot find {cases_path}")
+        sys.exit(1)
+
+    registry, parsed = load_registry(cases_path, args.cache)
+    print(f"registry: {parsed} sections parsed", file=sys.stderr)
+    cases = registry.query(args.mechanism, args.domain, args.entity,
+                           args.status, active)
+
+    if args.output != "text":
+        report_writer.write_rows(args.output, CASE_HEADER, case_rows(cases),
+                                 {"report": "case_registry"})
+        return
+
+    lines = [f"{len(cases)} of {len(registry.cases)} cases", ""]
+    for c in cases:
+        mechanisms = ", ".join(
+            f"{m} {registry.mechanisms.get(str(m), '')}".rstrip()
+            for m in c["mechanisms"])
+        lines.append(f"  {c['id']:<6} {c.get('subject', '')}")
+        lines.append(f"         {c.get('entity', '')} | {c['domain']} | "
+                     f"{c.get('date_range', '')} | {c.get('status', '')}")
+        lines.append(f"         mechanisms: {mechanisms}")
+    report_writer.write_lines(lines)
+
+
+if __name__ == "__main__":
+    main()
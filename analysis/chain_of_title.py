@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+CHAIN OF TITLE — OWNERSHIP CONSOLIDATION BY ULTIMATE PARENT
+
+Follows patent ownership through reassignments. Each reassignment edge
+(date, assignor, assignee) folds the assignor and everything it already
+controls into the assignee's group. Groups are kept in a union-find
+(union by size, path compression), so any number of chained transfers
+costs near-constant time per edge, and every group reports its ultimate
+parent: the entity at the end of the chain.
+
+Filings and transfers are replayed in date order. Concentration is kept
+up to date as they are applied. HHI comes from a running sum of squared
+group holdings, and the top-k share from a lazily pruned heap. Per-year
+metrics are therefore read off at each year boundary rather than
+recomputed.
+
+Edges come from the patent dataset (original_assignee -> current_holder
+at acquisition_date) and, optionally, a reassignment CSV with date,
+assignor and assignee columns. Edges without a date are applied after
+the dated ones and show up in the "current" row.
+
+Usage:
+    python chain_of_title.py
+    python chain_of_title.py --edges reassignments.csv --top-k 4 -o csv
+"""
+
+import argparse
+import csv
+import heapq
+import os
+import sys
+from itertools import chain
+
+import report_writer
+from patent_pattern import get_year, iter_records
+
+# Event kinds, in the order they apply on the same date
+TRANSFER = 0
+FILING = 1
+
+
+class OwnershipGroups:
+    """
+    Union-find of entities with patent holdings per group.
+
+    transfer(assignor, assignee) merges groups; the merged group keeps
+    the assignee's ultimate parent as its label. file(name) adds a
+    patent to name's group. hhi() and top(k) read the current
+    concentration without scanning all groups.
+    """
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}      # root -> member count (union by size)
+        self.label = {}     # root -> ultimate parent name
+        self.patents = {}   # root -> patents held by the group
+        self.total = 0
+        self.holding = 0    # groups with at least one patent
+        self.sum_sq = 0     # sum of squared group holdings
+        self._heap = []     # (-patents, root), pruned lazily
+
+    def find(self, name):
+        """Return the root of name's group, adding name if new."""
+        parent = self.parent
+        if name not in parent:
+            parent[name] = name
+            self.size[name] = 1
+            self.label[name] = name
+            self.patents[name] = 0
+            return name
+        root = name
+        while parent[root] != root:
+            root = parent[root]
+        while parent[name] != root:
+            parent[name], name = root, parent[name]
+        return root
+
+    def ultimate_parent(self, name):
+        return self.label[self.find(name)]
+
+    def _push(self, root):
+        heap = self._heap
+        heapq.heappush(heap, (-self.patents[root], root))
+        if len(heap) > 4 * len(self.patents) + 64:
+            self._heap = [(-n, r) for r, n in self.patents.items() if n]
+            heapq.heapify(self._heap)
+
+    def file(self, name, count=1):
+        """Add count patents to name's group."""
+        root = self.find(name)
+        held = self.patents[root]
+        self.patents[root] = held + count
+        self.total += count
+        self.sum_sq += 2 * held * count + count * count
+        if not held:
+            self.holding += 1
+        self._push(root)
+
+    def transfer(self, assignor, assignee):
+        """Fold assignor's group into assignee's. Returns False if joined."""
+        a = self.find(assignor)
+        b = self.find(assignee)
+        if a == b:
+            return False
+        owner = self.label[b]
+        if self.size[a] > self.size[b]:
+            a, b = b, a
+        self.parent[a] = b
+        self.size[b] += self.size.pop(a)
+        del self.label[a]
+        self.label[b] = owner
+        pa = self.patents.pop(a)
+        pb = self.patents[b]
+        self.patents[b] = pa + pb
+        self.sum_sq += 2 * pa * pb
+        if pa and pb:
+            self.holding -= 1
+        if pa:
+            self._push(b)
+        return True
+
+    def hhi(self):
+        """Herfindahl-Hirschman index of holdings (0-10000)."""
+        return self.sum_sq * 10000 / self.total ** 2 if self.total else 0.0
+
+    def top(self, k):
+        """Return the k largest groups as (ultimate parent, patents)."""
+        heap = self._heap
+        found = []
+        while heap and len(found) < k:
+            neg, root = heapq.heappop(heap)
+            if self.patents.get(root) == -neg and \
+                    all(root != r for _, r in found):
+                found.append((neg, root))
+        for entry in found:
+            heapq.heappush(heap, entry)
+        return [(self.label[root], -neg) for neg, root in found]
+
+    def groups(self):
+        """Yield (ultimate parent, members, patents) for every group."""
+        for root, size in self.size.items():
+            yield self.label[root], size, self.patents[root]
+
+
+def patent_events(records):
+    """
+    Yield (date, kind, a, b) events from patent records: a FILING for
+    each patent (a = original assignee) and a TRANSFER (a -> b) for each
+    distinct assignee/holder pair that differ. date is None if unknown.
+    """
+    seen = set()
+    for r in records:
+        assignee = r["original_assignee"]
+        date = r["filing_date"]
+        yield (date if get_year(date) else None, FILING, assignee, None)
+
+        holder = r["current_holder"]
+        if holder and holder != assignee:
+            date = r["acquisition_date"]
+            edge = (date if get_year(date) else None, assignee, holder)
+            if edge not in seen:
+                seen.add(edge)
+                yield (edge[0], TRANSFER, assignee, holder)
+
+
+def edge_events(path):
+    """Yield TRANSFER events from a date,assignor,assignee CSV."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            date = row.get("date")
+            yield (date if get_year(date) else None, TRANSFER,
+                   row["assignor"], row["assignee"])
+
+
+def consolidation(events, top_k=4):
+    """
+    Replay events and return (groups, rows).
+
+    rows holds one metrics tuple per year that has events, in METRIC_HEADER
+    order, then a "current" row after the undated events.
+    """
+    groups = OwnershipGroups()
+    dated = []
+    undated = []
+    for event in events:
+        (dated if event[0] is not None else undated).append(event)
+    dated.sort(key=lambda e: (e[0], e[1]))
+
+    def snapshot(year):
+        top = groups.top(top_k)
+        share = (sum(n for _, n in top) * 100 / groups.total
+                 if groups.total else 0.0)
+        return (year, groups.total, groups.holding, round(groups.hhi(), 1),
+                round(share, 1), top[0][0] if top else "")
+
+    def apply(kind, a, b):
+        if kind == FILING:
+            groups.file(a)
+        else:
+            groups.transfer(a, b)
+
+    rows = []
+    year = None
+    for date, kind, a, b in dated:
+        event_year = get_year(date)
+        if year is not None and event_year != year:
+            rows.append(snapshot(year))
+        year = event_year
+        apply(kind, a, b)
+    if year is not None:
+        rows.append(snapshot(year))
+
+    for _, kind, a, b in sorted(undated, key=lambda e: e[1]):
+        apply(kind, a, b)
+    rows.append(snapshot("current"))
+    return groups, rows
+
+
+METRIC_HEADER = ("year", "patents", "groups", "hhi", "top_k_share",
+                 "top_holder")
+
+
+def print_report(groups, rows, top_k):
+    lines = ["=" * 70, "CHAIN OF TITLE — CONSOLIDATION BY ULTIMATE PARENT",
+             "=" * 70, ""]
+    lines.append(f"  {'year':>7} {'patents':>8} {'groups':>7} {'HHI':>8} "
+                 f"{f'top-{top_k}':>7}  largest group")
+    for year, patents, holding, hhi, share, top in rows:
+        lines.append(f"  {year:>7} {patents:>8} {holding:>7} {hhi:>8.1f} "
+                     f"{share:>6.1f}%  {top}")
+    lines += ["", "-" * 70, "ULTIMATE PARENTS", "-" * 70]
+    holders = sorted((g for g in groups.groups() if g[2]),
+                     key=lambda g: -g[2])
+    for name, members, patents in holders:
+        lines.append(f"    {name}: {patents} patents "
+                     f"({members} entit{'y' if members == 1 else 'ies'})")
+    report_writer.write_lines(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay patent filings and reassignments through a "
+                    "union-find of ultimate parents and report per-year "
+                    "ownership concentration."
+    )
+    parser.add_argument(
+        "--file", "-f",
+        type=str,
+        default=None,
+        help="Path to patent CSV (default: energy_patent_acquisitions.csv "
+             "in the same directory)"
+    )
+    parser.add_argument(
+        "--edges", "-e",
+        type=str,
+        default=None,
+        help="Additional reassignment edges: CSV with date, assignor and "
+             "assignee columns"
+    )
+    parser.add_argument(
+        "--top-k", "-k",
+        type=int,
+        default=4,
+        help="Groups counted in the top-k share (default: 4)"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        choices=report_writer.FORMATS,
+        default="text",
+        help="Output format: text (default), or per-year metric rows as "
+             "csv, jsonl or binary"
+    )
+
+    args = parser.parse_args()
+
+    if args.output == "binary" and sys.stdout.isatty():
+        parser.error("--output binary writes binary data; redirect stdout")
+    if args.edges and not os.path.exists(args.edges):
+        print(f"ERROR: Cannot find {args.edges}")
+        sys.exit(1)
+
+    events = patent_events(iter_records(args.file))
+    if args.edges:
+        events = chain(events, edge_events(args.edges))
+    groups, rows = consolidation(events, args.top_k)
+
+    if args.output == "text":
+        print_report(groups, rows, args.top_k)
+    else:
+        report_writer.write_rows(
+            args.output, METRIC_HEADER,
+            [(str(row[0]),) + row[1:] for row in rows],
+            {"report": "chain_of_title", "top_k": args.top_k})
+
+
+if __name__ == "__main__":
+    main()
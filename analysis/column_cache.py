@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk cache for parsed, typed datasets.
+
+A cache file holds one dataset as flat NumPy arrays plus a small JSON
+header. The arrays sit at aligned offsets after the header, so a warm
+load is a single mmap and no parsing. Each cache is tied to its source
+file by path, size, mtime and SHA-256 of the contents:
+
+- size and mtime unchanged          -> hit, nothing is read from the source
+- mtime changed, contents identical -> hit, header refreshed
+- anything else                     -> miss, caller re-parses and stores
+
+Layout:
+
+    MAGIC (8 bytes) | header length (uint64 LE) | header JSON | arrays...
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+try:
+    import numpy as np
+except ImportError:  # only needed once a cache is read or written
+    np = None
+
+MAGIC = b"AECACHE1"
+ALIGN = 64
+HASH_BLOCK = 1 << 20
+
+
+def default_cache_dir():
+    """Return the cache directory ($AETHER_CACHE_DIR or ~/.cache/aether)."""
+    if os.environ.get("AETHER_CACHE_DIR"):
+        return os.environ["AETHER_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "aether")
+
+
+def cache_path_for(source_path, namespace, cache_dir=None,
+                   suffix=".colcache"):
+    """Return the cache file used for source_path under namespace."""
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    source = os.path.abspath(source_path)
+    tag = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{namespace}-{tag}{suffix}")
+
+
+def file_digest(path):
+    """Return the hex SHA-256 of a file, read in 1 MiB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_key(path, digest=None):
+    """Return the identity of a source file as stored in cache headers."""
+    st = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": digest if digest is not None else file_digest(path),
+    }
+
+
+def _padded(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_cache(cache_path, key, arrays, meta=None):
+    """
+    Write arrays (name -> 1-D ndarray) and JSON-able meta to cache_path.
+
+    The file is written to a temporary name and renamed into place, so a
+    concurrent reader never sees a partial cache.
+    """
+    arrays = {name: np.ascontiguousarray(arr)
+              for name, arr in arrays.items()}
+    specs = {}
+    offset = 0
+    for name, arr in arrays.items():
+        specs[name] = {"dtype": arr.dtype.str, "length": int(arr.size),
+                       "offset": offset}
+        offset = _padded(offset + arr.nbytes)
+
+    header = json.dumps({"key": key, "meta": meta or {},
+                         "arrays": specs}).encode("utf-8")
+    data_start = _padded(len(MAGIC) + 8 + len(header))
+
+    directory = os.path.dirname(os.path.abspath(cache_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for name, arr in arrays.items():
+                f.seek(data_start + specs[name]["offset"])
+                f.write(arr.tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_cache(cache_path):
+    """
+    Memory-map a cache file.
+
+    Returns (key, meta, arrays) with read-only arrays backed by the map,
+    or None if the file is missing or not a cache.
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        data_start = _padded(len(MAGIC) + 8 + header_len)
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            arrays[name] = np.frombuffer(mm, dtype=np.dtype(spec["dtype"]),
+                                         count=spec["length"],
+                                         offset=data_start + spec["offset"])
+        return header["key"], header["meta"], arrays
+    except (OSError, ValueError, KeyError, TypeError, struct.error):
+        # Missing, truncated or foreign file: treat as a miss
+        return None
+
+
+def lookup(source_path, cache_path):
+    """
+    Return cached (meta, arrays) for source_path, or None on a miss.
+
+    A changed mtime with unchanged size triggers a content hash; when the
+    contents still match, the header is rewritten with the new mtime so
+    the next lookup is a pure stat check again.
+    """
+    cached = read_cache(cache_path)
+    if cached is None:
+        return None
+    key, meta, arrays = cached
+
+    st = os.stat(source_path)
+    if key.get("path") != os.path.abspath(source_path) or \
+            key.get("size") != st.st_size:
+        return None
+    if key.get("mtime_ns") == st.st_mtime_ns:
+        return meta, arrays
+
+    fresh = source_key(source_path)
+    if fresh["sha256"] != key.get("sha256"):
+        return None
+    write_cache(cache_path, fresh, arrays, meta)
+    return meta, arrays
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+ENTITY JOIN — PATENT HOLDERS AND REVOLVING-DOOR EMPLOYERS
+
+Links the patent dataset (current_holder, original_assignee) to the
+FDA career records (subsequent_employer) on shared organizations, e.g.
+an employer that also holds or acquired patents.
+
+Join keys are normalized names (entity_names.normalize). A name that
+lists several organizations ("Pharmacia/Pfizer", "Cobasys LLC
+(Chevron)") yields one key per organization, and role words such as
+"Board" are dropped. With --resolve-names each organization is first
+mapped through one NameResolver shared by both sides, so spelling
+variants meet on the same key.
+
+It is a hash join: one side (by default the career records, the
+smaller one) is loaded into a table keyed by organization, and the
+other is streamed through it row by row, so the cost is linear in
+the input plus the matches. Each key's entries are sorted by date,
+so a time-window condition such as
+
+    --within 12 --direction after   (departure 0-12 months after the
+                                     acquisition)
+
+is answered by a binary search per probe. Dates are handled as month
+ranges: departure_year covers its whole year, so a departure in 2001
+is within 6 months of an acquisition in March 2001.
+
+Usage:
+    python entity_join.py
+    python entity_join.py --within 24 --direction after --pairs -o csv
+"""
+
+import argparse
+import os
+import re
+import sys
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+import entity_names
+import report_writer
+from patent_pattern import iter_records
+from regulatory_capture_index import parse_data, read_records
+from time_index import date_key
+
+# Patent name field -> the date it holds from
+PATENT_FIELDS = {
+    "holder": ("current_holder", "acquisition_date"),
+    "assignee": ("original_assignee", "filing_date"),
+}
+# Words naming a role at an organization rather than the organization
+ROLE_WORDS = frozenset(("board",))
+
+_PARTS_RE = re.compile(r"[/()]")
+
+
+def month_span(value):
+    """
+    Return (first, last) month numbers (year * 12 + month - 1) covered
+    by a date 'YYYY[-MM[-DD]]' or a year, or None if it is not a date.
+    """
+    key = date_key(value)
+    if key is None:
+        return None
+    year, month = key // 10000, key // 100 % 100
+    if not month:
+        return year * 12, year * 12 + 11
+    return year * 12 + month - 1, year * 12 + month - 1
+
+
+def join_keys(name, resolver=None):
+    """Return the set of organization keys for a name."""
+    keys = set()
+    for part in _PARTS_RE.split(name):
+        part = part.strip()
+        if not part:
+            continue
+        if resolver is not None:
+            part = resolver.resolve(part)
+        words = [w for w in entity_names.normalize(part).split()
+                 if w not in ROLE_WORDS]
+        if words:
+            keys.add(" ".join(words))
+    return keys
+
+
+class HashJoin:
+    """
+    Hash table of build rows by key, with entries sorted by date.
+
+    window is None (any dates) or (lo, hi): a probe matches a build row
+    if some month of the probe span minus some month of the build span
+    lies in lo..hi.
+    """
+
+    def __init__(self, window=None):
+        self.window = window
+        self._entries = defaultdict(list)   # key -> [(first, last, id)]
+        self._starts = {}
+        self._width = 0                     # widest build span
+        self.rows = []
+
+    def add(self, keys, span, row):
+        """Add a build row under keys. span may be None without a window."""
+        if not keys or (self.window is not None and span is None):
+            return
+        row_id = len(self.rows)
+        self.rows.append(row)
+        first, last = span if span is not None else (0, 0)
+        self._width = max(self._width, last - first)
+        for key in keys:
+            self._entries[key].append((first, last, row_id))
+        self._starts.clear()
+
+    def _sorted(self, key):
+        starts = self._starts.get(key)
+        if starts is None:
+            entries = self._entries[key]
+            entries.sort()
+            starts = self._starts[key] = [e[0] for e in entries]
+        return starts
+
+    def probe(self, keys, span=None):
+        """Yield (key, build row id) for every build row matching."""
+        if self.window is not None and span is None:
+            return
+        for key in keys:
+            entries = self._entries.get(key)
+            if not entries:
+                continue
+            if self.window is None:
+                for _, _, row_id in entries:
+                    yield key, row_id
+                continue
+            lo, hi = self.window
+            first, last = span
+            starts = self._sorted(key)
+            i = bisect_left(starts, first - hi - self._width)
+            j = bisect_right(starts, last - lo)
+            for b_first, b_last, row_id in entries[i:j]:
+                if b_last >= first - hi:
+                    yield key, row_id
+
+
+def _key_cache(resolver):
+    """Return join_keys memoized per name (names repeat across rows)."""
+    cache = {}
+
+    def keys(name):
+        found = cache.get(name)
+        if found is None:
+            found = cache[name] = frozenset(join_keys(name, resolver))
+        return found
+    return keys
+
+
+def patent_side(records, fields, resolver=None):
+    """Yield (keys, span, row) per patent name field, row as tuple."""
+    keys = _key_cache(resolver)
+    for r in records:
+        for field in fields:
+            name_field, date_field = PATENT_FIELDS[field]
+            name = r[name_field]
+            yield (keys(name), month_span(r[date_field]),
+                   (r["patent_number"], field, name, r[date_field]))
+
+
+def career_side(records, resolver=None):
+    """Yield (keys, span, row) per career record, row as tuple."""
+    keys = _key_cache(resolver)
+    for r in records:
+        employer = r["subsequent_employer"]
+        yield (keys(employer), month_span(r["departure_year"]),
+               (r["name"], r["division"], employer, r["departure_year"]))
+
+
+def _window(within, direction):
+    """Months allowed for departure minus acquisition, or None."""
+    if within is None:
+        return None
+    return {"any": (-within, within), "after": (0, within),
+            "before": (-within, 0)}[direction]
+
+
+def gap_months(patent_span, career_span, window=None):
+    """
+    Return departure minus patent date in months: the difference of
+    least magnitude between a month of each span, within window if one
+    is given. The pair must match (the ranges overlap).
+    """
+    lo = career_span[0] - patent_span[1]
+    hi = career_span[1] - patent_span[0]
+    if window is not None:
+        lo, hi = max(lo, window[0]), min(hi, window[1])
+    return min(max(lo, 0), hi)
+
+
+JOIN_HEADER = ("entity", "patent_number", "patent_field", "patent_entity",
+               "patent_date", "name", "division", "employer",
+               "departure_year", "gap_months")
+SUMMARY_HEADER = ("entity", "patents", "people", "pairs")
+
+
+def join(patents, careers, within=None, direction="any", build="careers"):
+    """
+    Yield JOIN_HEADER rows for every (patent field, career) pair that
+    share an organization key and satisfy the time window.
+
+    patents and careers are the side iterators from patent_side() and
+    career_side(). The build side is loaded into a HashJoin; the other
+    is consumed one row at a time. gap_months is the departure month
+    nearest the patent date within the window (see gap_months()).
+    """
+    window = table_window = _window(within, direction)
+    if build == "careers":
+        build_side, probe_side = careers, patents
+        if window is not None:  # probe is the patent: flip the sign
+            table_window = (-window[1], -window[0])
+    else:
+        build_side, probe_side = patents, careers
+
+    table = HashJoin(table_window)
+    for keys, span, row in build_side:
+        table.add(keys, span, row)
+
+    for keys, span, row in probe_side:
+        seen = set()
+        for key, row_id in table.probe(keys, span):
+            if row_id in seen:
+                continue
+            seen.add(row_id)
+            other = table.rows[row_id]
+            patent, career = ((row, other) if build == "careers"
+                              else (other, row))
+            p_span = month_span(patent[3])
+            c_span = month_span(career[3])
+            gap = (gap_months(p_span, c_span, window)
+                   if p_span and c_span else "")
+            yield (key,) + patent + career + (gap,)
+
+
+def summary_rows(pairs):
+    """Return SUMMARY_HEADER rows from JOIN_HEADER rows, largest first."""
+    patents = defaultdict(set)
+    people = defaultdict(set)
+    counts = defaultdict(int)
+    for row in pairs:
+        key = row[0]
+        patents[key].add(row[1])
+        people[key].add(row[5])
+        counts[key] += 1
+    return sorted(((key, len(patents[key]), len(people[key]), counts[key])
+                   for key in counts), key=lambda r: (-r[3], r[0]))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Join patent holders and assignees to FDA reviewers' "
+                    "subsequent employers on normalized organization "
+                    "names, optionally within a time window."
+    )
+    parser.add_argument(
+        "--file", "-f",
+        type=str,
+        default=None,
+        help="Path to patent CSV (default: energy_patent_acquisitions.csv "
+             "in the same directory)"
+    )
+    parser.add_argument(
+        "--careers", "-c",
+        type=str,
+        default=None,
+        help="Career records CSV in the RAW_DATA layout of "
+             "regulatory_capture_index.py (default: the embedded dataset)"
+    )
+    parser.add_argument(
+        "--patent-fields",
+        choices=["holder", "assignee", "both"],
+        default="both",
+        help="Patent names to join on: current_holder (dated by "
+             "acquisition_date), original_assignee (dated by filing_date) "
+             "or both (default)"
+    )
+    parser.add_argument(
+        "--within", "-w",
+        type=int,
+        default=None,
+        metavar="MONTHS",
+        help="Only pairs whose departure is within MONTHS of the patent "
+             "date"
+    )
+    parser.add_argument(
+        "--direction",
+        choices=["any", "after", "before"],
+        default="any",
+        help="With --within: departure after, before, or either side of "
+             "the patent date (default: any)"
+    )
+    parser.add_argument(
+        "--build",
+        choices=["careers", "patents"],
+        default="careers",
+        help="Side held in the hash table; the other is streamed "
+             "(default: careers, use the smaller side)"
+    )
+    parser.add_argument(
+        "--resolve-names",
+        action="store_true",
+        help="Map organization spellings on both sides to canonical names "
+             "(n-gram fuzzy matching, see entity_names.py) before joining"
+    )
+    parser.add_argument(
+        "--names",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Persisted canonical-name map for --resolve-names "
+             "(default: entity-names-join.json in the cache directory)"
+    )
+    parser.add_argument(
+        "--pairs",
+        action="store_true",
+        help="Output one row per matched pair instead of the per-entity "
+             "summary"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        choices=report_writer.FORMATS,
+        default="text",
+        help="Output format: text (default), csv, jsonl, or binary"
+    )
+
+    args = parser.parse_args()
+
+    if args.output == "binary" and sys.stdout.isatty():
+        parser.error("--output binary writes binary data; redirect stdout")
+    if args.within is not None and args.within < 0:
+        parser.error("--within must not be negative")
+    for path in (args.file, args.careers):
+        if path and not os.path.exists(path):
+            print(f"ERROR: Cannot find {path}")
+            sys.exit(1)
+
+    resolver = None
+    if args.resolve_names:
+        names_path = args.names or entity_names.default_names_path("join")
+        resolver = entity_names.NameResolver.load(names_path)
+
+    if args.careers:
+        with open(args.careers, "r", encoding="utf-8", newline="") as f:
+            careers = read_records(f)
+    else:
+        careers = parse_data()
+    fields = (("holder", "assignee") if args.patent_fields == "both"
+              else (args.patent_fields,))
+    pairs = join(patent_side(iter_records(args.file), fields, resolver),
+                 career_side(careers, resolver),
+                 args.within, args.direction, args.build)
+
+    if args.pairs:
+        header, rows = JOIN_HEADER, pairs
+    else:
+        header, rows = SUMMARY_HEADER, summary_rows(pairs)
+    if args.output == "text":
+        rows = list(rows)
+        window = (f", departure within {args.within} months "
+                  f"({args.direction})" if args.within is not None else "")
+        lines = [f"{len(rows)} {'pairs' if args.pairs else 'entities'} "
+                 f"linking patents and employers{window}", ""]
+        if args.pairs:
+            for (key, number, field, entity, date, name, division,
+                 employer, year, gap) in rows:
+                lines.append(f"  {key}: {number} ({field} {entity}, {date})"
+                             f" <- {name}, {division}, {employer} ({year}"
+                             f"{f', {gap:+d} mo' if gap != '' else ''})")
+        else:
+            for key, patents, people, count in rows:
+                lines.append(f"  {key}: {patents} patents, {people} people, "
+                             f"{count} pairs")
+        report_writer.write_lines(lines)
+    else:
+        report_writer.write_rows(args.output, header, rows,
+                                 {"report": "entity_join",
+                                  "within": args.within,
+                                  "direction": args.direction})
+    if resolver is not None:
+        resolver.save(names_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Canonical names for assignees, holders and employers.
+
+The same organization appears under many spellings ("Cobasys LLC
+(Chevron)", "COBASYS L.L.C. (CHEVRON)", "Pfizer, Inc.", "Pfizer Inc").
+NameResolver maps every spelling to one canonical name:
+
+1. normalize() lowercases, strips accents and punctuation and drops
+   legal suffixes (LLC, Inc., Co., ...).
+2. Normalized keys are compared by Dice similarity of character n-gram
+   sets. Candidates come from an n-gram blocking index (n-gram ->
+   canonical names containing it) with a size filter, so a lookup only
+   scores names that share n-grams with the query, never all pairs.
+   Very common n-grams are skipped when blocking.
+3. A name with no candidate at or above the threshold becomes a new
+   canonical name (the first spelling seen).
+
+Every raw spelling resolved is memoized, and the canonical list plus
+the memo can be saved to JSON, so later runs skip matching entirely
+for names already seen and keep the same canonical choices.
+
+Usage:
+    python entity_names.py --file energy_patent_acquisitions.csv \\
+        --column current_holder
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import unicodedata
+from collections import defaultdict
+
+import column_cache
+
+NAMES_VERSION = 1
+
+LEGAL_SUFFIXES = frozenset((
+    "llc", "inc", "incorporated", "co", "corp", "corporation", "company",
+    "ltd", "limited", "plc", "ag", "sa", "gmbh", "lp", "llp", "nv", "bv",
+))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(name):
+    """Return the comparison key for a name."""
+    text = unicodedata.normalize("NFKD", name)
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    # join dotted abbreviations first: "l.l.c." -> "llc"
+    text = re.sub(r"\b(?:[a-z]\.){2,}",
+                  lambda m: m.group(0).replace(".", ""), text)
+    tokens = _TOKEN_RE.findall(text)
+    kept = [t for t in tokens if t not in LEGAL_SUFFIXES]
+    return " ".join(kept or tokens)
+
+
+def ngrams(key, n=3):
+    """Return the set of character n-grams of a key, padded by a space."""
+    padded = f" {key} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def default_names_path(namespace):
+    """Return the persisted map for namespace under the cache directory."""
+    return os.path.join(column_cache.default_cache_dir(),
+                        f"entity-names-{namespace}.json")
+
+
+class NameResolver:
+    """
+    Incremental name canonicalization with an n-gram blocking index.
+
+    resolve(name) returns the canonical name for any spelling. threshold
+    is the minimum Dice similarity of n-gram sets for two keys to be the
+    same entity; n-grams found in more than max_postings canonical names
+    are not used for blocking.
+    """
+
+    def __init__(self, threshold=0.8, n=3, max_postings=1000):
+        self.threshold = threshold
+        self.n = n
+        self.max_postings = max_postings
+        self.canonical = []          # id -> canonical name
+        self._keys = {}              # normalized key -> id
+        self._grams = []             # id -> n-gram set
+        self._postings = defaultdict(list)
+        self.aliases = {}            # raw name -> id (the memo)
+        self.dirty = False
+
+    def _add(self, name, key):
+        cid = len(self.canonical)
+        grams = ngrams(key, self.n)
+        self.canonical.append(name)
+        self._keys[key] = cid
+        self._grams.append(grams)
+        for gram in grams:
+            self._postings[gram].append(cid)
+        return cid
+
+    def _match(self, key):
+        """Return the id of the best canonical match for key, or None."""
+        cid = self._keys.get(key)
+        if cid is not None:
+            return cid
+        grams = ngrams(key, self.n)
+        t = self.threshold
+        low = math.ceil(len(grams) * t / (2 - t))
+        high = math.floor(len(grams) * (2 - t) / t)
+
+        hits = defaultdict(int)
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting and len(posting) <= self.max_postings:
+                for c in posting:
+                    hits[c] += 1
+
+        best, best_score = None, 0.0
+        for c in hits:
+            other = self._grams[c]
+            if not low <= len(other) <= high:
+                continue
+            score = 2 * len(grams & other) / (len(grams) + len(other))
+            # ties go to the earliest canonical name
+            if score >= t and (score > best_score or
+                               (score == best_score and c < best)):
+                best, best_score = c, score
+        return best
+
+    def resolve(self, name):
+        """Return the canonical name for name, registering it if new."""
+        cid = self.aliases.get(name)
+        if cid is None:
+            key = normalize(name)
+            cid = self._match(key)
+            if cid is None:
+                cid = self._add(name, key)
+            self.aliases[name] = cid
+            self.dirty = True
+        return self.canonical[cid]
+
+    def groups(self):
+        """Return {canonical name: [spellings]} for every name seen."""
+        out = defaultdict(list)
+        for name, cid in self.aliases.items():
+            out[self.canonical[cid]].append(name)
+        return dict(out)
+
+    @classmethod
+    def load(cls, path, threshold=0.8, n=3):
+        """
+        Load a saved map, or return an empty resolver if path is missing
+        or was built with different settings.
+        """
+        resolver = cls(threshold, n)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("version") != NAMES_VERSION or \
+                    saved["threshold"] != threshold or saved["n"] != n:
+                return resolver
+            for name in saved["canonical"]:
+                resolver._add(name, normalize(name))
+            resolver.aliases = dict(saved["aliases"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls(threshold, n)
+        return resolver
+
+    def save(self, path):
+        """Write the map atomically if anything was added since load."""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": NAMES_VERSION,
+                           "threshold": self.threshold, "n": self.n,
+                           "canonical": self.canonical,
+                           "aliases": self.aliases}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.dirty = False
+
+
+def resolve_fields(records, resolver, fields):
+    """Yield records with each of fields replaced by its canonical name."""
+    resolve = resolver.resolve
+    for r in records:
+        for field in fields:
+            r[field] = resolve(r[field])
+        yield r
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Group the spellings of names in a CSV column under "
+                    "canonical names."
+    )
+    parser.add_argument("--file", "-f", required=True,
+                        help="CSV file to read names from")
+    parser.add_argument("--column", "-c", required=True,
+                        help="Column holding the names")
+    parser.add_argument("--names", default=None,
+                        help="Persisted name map to load and update "
+                             "(default: none)")
+    parser.add_argument("--threshold", type=float, default=0.8,
+                        help="Minimum n-gram Dice similarity (default: 0.8)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"ERROR: Cannot find {args.file}")
+        sys.exit(1)
+
+    resolver = (NameResolver.load(args.names, args.threshold) if args.names
+                else NameResolver(args.threshold))
+    with open(args.file, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            resolver.resolve(row[args.column])
+    if args.names:
+        resolver.save(args.names)
+
+    for canonical, spellings in sorted(resolver.groups().items()):
+        print(canonical)
+        for spelling in sorted(spellings):
+            if spelling != canonical:
+                print(f"    {spelling}")
+
+
+if __name__ == "__main__":
+    main()
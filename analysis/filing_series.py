@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+FILING SERIES — PREFIX-SUM FILING RATES AND CHANGEPOINT SEARCH
+
+Yearly filing counts from the patent dataset, overall and per
+technology_category or current_holder, held as cumulative-count arrays.
+Any window total or average is then two array lookups, so every cutoff
+year can be evaluated at once:
+
+    rate_change(cutoff)   average filings per year before vs. after a
+                          cutoff year (the cutoff year itself belongs to
+                          neither side, as in patent_pattern's
+                          pre/post-acquisition averages)
+    changepoints()        for every group, the cutoff with the largest
+                          drop in filing rate, found in one vectorized
+                          pass over all (group, cutoff) pairs
+
+Averages are taken over the years that have filings ("active", as in
+patent_pattern) or over calendar years ("calendar"; years without
+filings count as zero, which is what a changepoint search needs).
+
+Usage:
+    python filing_series.py --cutoff 2001
+    python filing_series.py --by category --changepoints --top 10
+"""
+
+import argparse
+import os
+import sys
+from array import array
+
+import report_writer
+from patent_pattern import ACQUISITION_YEAR, get_year, iter_records
+
+try:
+    import numpy as np
+except ImportError:  # the series engine is numpy-only
+    np = None
+
+# Dimension name -> record field grouping the series (None: all filings)
+DIMENSIONS = {
+    "all": None,
+    "category": "technology_category",
+    "holder": "current_holder",
+}
+ALL_FILINGS = "all filings"
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("filing_series requires numpy "
+                          "(pip install -r requirements.txt)")
+
+
+class FilingSeries:
+    """
+    Filings per (group, year) with prefix sums.
+
+    counts[g, i] is the number of filings of group labels[g] in year
+    first_year + i. filings and active are the cumulative sums of counts
+    and of counts > 0 along the year axis, with a leading zero column, so
+    the total for years [a, b) is filings[:, b] - filings[:, a].
+    """
+
+    def __init__(self, first_year, labels, counts):
+        _require_numpy()
+        self.first_year = first_year
+        self.labels = labels
+        self.counts = counts
+        zero = np.zeros((len(labels), 1), dtype=np.int64)
+        self.filings = np.hstack([zero, np.cumsum(counts, axis=1)])
+        self.active = np.hstack([zero, np.cumsum(counts > 0, axis=1)])
+        # first year with a filing, per group
+        self.start = np.argmax(counts > 0, axis=1)
+
+    @property
+    def years(self):
+        return np.arange(self.first_year,
+                         self.first_year + self.counts.shape[1])
+
+    def _index(self, year):
+        return int(np.clip(year - self.first_year, 0, self.counts.shape[1]))
+
+    def window(self, start, end):
+        """
+        Return (filings, active_years, calendar_years) per group for the
+        years start..end inclusive. Calendar years start at each group's
+        first filing.
+        """
+        i = self._index(start)
+        j = self._index(end + 1)
+        calendar = np.maximum(j - np.maximum(self.start, i), 0)
+        return (self.filings[:, j] - self.filings[:, i],
+                self.active[:, j] - self.active[:, i], calendar)
+
+    def window_mean(self, start, end, per="active"):
+        """Average filings per year over start..end, per group."""
+        total, active, calendar = self.window(start, end)
+        years = active if per == "active" else calendar
+        return np.divide(total, years, out=np.zeros(len(self.labels)),
+                         where=years > 0)
+
+    def rate_change(self, cutoff=ACQUISITION_YEAR, per="active"):
+        """
+        Return (pre_avg, post_avg, decline_pct) arrays over groups for
+        the years before and after cutoff.
+        """
+        last = self.first_year + self.counts.shape[1] - 1
+        pre = self.window_mean(self.first_year, cutoff - 1, per)
+        post = self.window_mean(cutoff + 1, last, per)
+        decline = np.divide((pre - post) * 100, pre,
+                            out=np.zeros(len(self.labels)), where=pre > 0)
+        return pre, post, decline
+
+    def changepoints(self, min_years=2, per="calendar"):
+        """
+        Find, for every group, the cutoff year with the largest drop in
+        average filings per year (before minus after).
+
+        Each side must span at least min_years years. Returns a list of
+        (label, cutoff, pre_avg, post_avg, decline_pct) ordered by drop,
+        largest first; groups with no valid cutoff are left out.
+        """
+        n = self.counts.shape[1]
+        if n == 0:
+            return []
+        k = np.arange(n)  # cutoff year first_year + k
+        pre_total = self.filings[:, :n]
+        post_total = self.filings[:, n:] - self.filings[:, 1:]
+        if per == "active":
+            pre_years = self.active[:, :n]
+            post_years = self.active[:, n:] - self.active[:, 1:]
+        else:
+            pre_years = np.maximum(k - self.start[:, None], 0)
+            post_years = np.broadcast_to(n - 1 - k, pre_total.shape)
+        span_ok = ((np.maximum(k - self.start[:, None], 0) >= min_years)
+                   & (n - 1 - k >= min_years))
+        zeros = np.zeros(pre_total.shape)
+        pre_avg = np.divide(pre_total, pre_years, out=zeros.copy(),
+                            where=pre_years > 0)
+        post_avg = np.divide(post_total, post_years, out=zeros.copy(),
+                             where=post_years > 0)
+        drop = np.where(span_ok, pre_avg - post_avg, -np.inf)
+
+        rows = np.arange(len(self.labels))
+        best = np.argmax(drop, axis=1)
+        best_drop = drop[rows, best]
+        found = np.isfinite(best_drop)
+        order = np.argsort(-best_drop[found], kind="stable")
+        result = []
+        for g in rows[found][order]:
+            b = best[g]
+            pre, post = float(pre_avg[g, b]), float(post_avg[g, b])
+            result.append((self.labels[g], self.first_year + int(b), pre,
+                           post, (pre - post) / pre * 100 if pre else 0.0))
+        return result
+
+
+def build_series(records, dimensions=("all",)):
+    """
+    Build a FilingSeries per dimension (keys of DIMENSIONS) in one pass
+    over records. Records without a filing year are skipped.
+    """
+    _require_numpy()
+    fields = [DIMENSIONS[d] for d in dimensions]
+    years = array("i")
+    codes = [array("i") for _ in dimensions]
+    indexes = [{} for _ in dimensions]
+
+    for r in records:
+        year = get_year(r["filing_date"])
+        if not year:
+            continue
+        years.append(year)
+        for field, col, index in zip(fields, codes, indexes):
+            label = r[field] if field else ALL_FILINGS
+            col.append(index.setdefault(label, len(index)))
+
+    year_arr = np.frombuffer(years, dtype=np.int32).astype(np.int64) \
+        if len(years) else np.zeros(0, dtype=np.int64)
+    first = int(year_arr.min()) if len(year_arr) else 0
+    n = int(year_arr.max()) - first + 1 if len(year_arr) else 0
+
+    series = {}
+    for dimension, col, index in zip(dimensions, codes, indexes):
+        code_arr = np.frombuffer(col, dtype=np.int32).astype(np.int64) \
+            if len(col) else np.zeros(0, dtype=np.int64)
+        flat = np.bincount(code_arr * n + (year_arr - first),
+                           minlength=len(index) * n)
+        series[dimension] = FilingSeries(
+            first, list(index), flat.reshape(len(index), n))
+    return series
+
+
+CUTOFF_HEADER = ("group", "cutoff", "pre_avg", "post_avg", "decline_pct")
+
+
+def cutoff_rows(series, cutoff, per="active"):
+    pre, post, decline = series.rate_change(cutoff, per)
+    for g, label in enumerate(series.labels):
+        yield (label, cutoff, round(float(pre[g]), 2),
+               round(float(post[g]), 2), round(float(decline[g]), 1))
+
+
+def changepoint_rows(series, min_years=2, per="calendar", top=None):
+    for label, cutoff, pre, post, decline in \
+            series.changepoints(min_years, per)[:top]:
+        yield (label, cutoff, round(pre, 2), round(post, 2),
+               round(decline, 1))
+
+
+def print_table(title, rows):
+    lines = ["=" * 70, title, "=" * 70, ""]
+    lines.append(f"  {'cutoff':>6} {'pre/yr':>8} {'post/yr':>8} "
+                 f"{'decline':>8}  group")
+    for label, cutoff, pre, post, decline in rows:
+        lines.append(f"  {cutoff:>6} {pre:>8.2f} {post:>8.2f} "
+                     f"{decline:>7.1f}%  {label}")
+    report_writer.write_lines(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Filing rates before/after any cutoff year and "
+                    "changepoint search, overall or per category/holder."
+    )
+    parser.add_argument(
+        "--file", "-f",
+        type=str,
+        default=None,
+        help="Path to CSV data file (default: "
+             "energy_patent_acquisitions.csv in the same directory)"
+    )
+    parser.add_argument(
+        "--by",
+        choices=sorted(DIMENSIONS),
+        default="all",
+        help="Group filings by technology category or current holder "
+             "(default: all)"
+    )
+    parser.add_argument(
+        "--cutoff",
+        type=int,
+        default=ACQUISITION_YEAR,
+        help=f"Cutoff year for --by rate comparison "
+             f"(default: {ACQUISITION_YEAR})"
+    )
+    parser.add_argument(
+        "--changepoints",
+        action="store_true",
+        help="Search every cutoff year for the largest filing-rate drop"
+    )
+    parser.add_argument(
+        "--min-years",
+        type=int,
+        default=2,
+        help="Changepoints: minimum years on each side (default: 2)"
+    )
+    parser.add_argument(
+        "--per",
+        choices=["active", "calendar"],
+        default=None,
+        help="Average over years with filings (active) or all calendar "
+             "years (default: active for --cutoff, calendar for "
+             "--changepoints)"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=None,
+        help="Changepoints: show only the N largest drops"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        choices=report_writer.FORMATS,
+        default="text",
+        help="Output format: text (default), csv, jsonl, or binary"
+    )
+
+    args = parser.parse_args()
+
+    if np is None:
+        parser.error("filing_series requires numpy "
+                     "(pip install -r requirements.txt)")
+    if args.output == "binary" and sys.stdout.isatty():
+        parser.error("--output binary writes binary data; redirect stdout")
+    if args.file and not os.path.exists(args.file):
+        print(f"ERROR: Cannot find {args.file}")
+        sys.exit(1)
+
+    series = build_series(iter_records(args.file), (args.by,))[args.by]
+
+    if args.changepoints:
+        per = args.per or "calendar"
+        rows = changepoint_rows(series, args.min_years, per, args.top)
+        title = f"LARGEST FILING-RATE DROPS BY {args.by.upper()} ({per})"
+    else:
+        per = args.per or "active"
+        rows = cutoff_rows(series, args.cutoff, per)
+        title = (f"FILING RATE BEFORE/AFTER {args.cutoff} BY "
+                 f"{args.by.upper()} ({per})")
+
+    if args.output == "text":
+        print_table(title, rows)
+    else:
+        report_writer.write_rows(args.output, CUTOFF_HEADER, rows,
+                                 {"report": "filing_series", "by": args.by,
+                                  "per": per})
+
+
+if __name__ == "__main__":
+    main()
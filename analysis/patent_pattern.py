@@ -17,29 +17,359 @@ CASE REFERENCE: 7.1, 7.2
 
 import argparse
 import csv
+import glob
+import hashlib
+import json
 import os
 import sys
+import tempfile
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
+import column_cache
+import entity_names
+import report_writer
+import stage_profile
+from compact_records import compact_rows
 
-def load_data(csv_path=None):
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # columnar engine is optional
+    np = None
+
+# Sentinel stored in the columnar year array when filing_date has no year.
+MISSING_YEAR = -1
+# Year Cobasys took over the portfolio; filing rates are compared for the
+# years before and after it (see filing_series.py for other cutoffs).
+ACQUISITION_YEAR = 2001
+
+
+def _default_csv_path():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "energy_patent_acquisitions.csv")
+
+
+# Organization names canonicalized by --resolve-names.
+NAME_FIELDS = ("original_assignee", "current_holder")
+
+# Columns whose values repeat across rows; shared between compact records.
+SHARED_FIELDS = ("original_assignee", "current_holder", "acquisition_date",
+                 "technology_category", "status")
+
+
+def iter_records(csv_path=None, compact=False):
+    """
+    Yield patent records from CSV file one row at a time.
+
+    With compact=True rows are slotted PatentRecord objects with interned
+    SHARED_FIELDS instead of dicts (see compact_records).
+    """
+    if csv_path is None:
+        csv_path = _default_csv_path()
+
+    if not os.path.exists(csv_path):
+        print(f"ERROR: Cannot find {csv_path}")
+        print("The CSV file must be in the same directory as this script.")
+        sys.exit(1)
+
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        if compact:
+            yield from compact_rows(csv.reader(f), "PatentRecord",
+                                    SHARED_FIELDS)
+        else:
+            yield from csv.DictReader(f)
+
+
+def load_data(csv_path=None, compact=False):
     """Load patent data from CSV file."""
+    return list(iter_records(csv_path, compact))
+
+
+class PatentColumns:
+    """
+    Columnar, typed view of a patent CSV.
+
+    years holds the filing year per row (MISSING_YEAR when absent).
+    original_assignee, current_holder and status are dictionary-encoded:
+    *_codes are integer arrays indexing into the matching name lists, which
+    are in order of first appearance so tallies keep the row-engine order.
+    """
+
+    def __init__(self, years, assignee_codes, assignees,
+                 holder_codes, holders, status_codes, statuses):
+        self.years = years
+        self.assignee_codes = assignee_codes
+        self.assignees = assignees
+        self.holder_codes = holder_codes
+        self.holders = holders
+        self.status_codes = status_codes
+        self.statuses = statuses
+
+    def __len__(self):
+        return len(self.years)
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("the columnar engine requires numpy "
+                          "(pip install -r requirements.txt)")
+
+
+COLUMN_FIELDS = ("filing_date", "original_assignee", "current_holder",
+                 "status")
+
+
+def _encode(values):
+    """
+    Dictionary-encode a bytes array ("S" dtype). Returns (codes, names)
+    with names decoded and in order of first appearance, as the row
+    engine tallies them.
+
+    Values are grouped by a 64-bit FNV-1a hash of their bytes, which
+    sorts much faster than the strings; the grouping is then checked
+    against the values themselves and redone on the strings if two
+    different values ever share a hash.
+    """
+    n = len(values)
+    if not n:
+        return np.zeros(0, dtype=np.intc), []
+    chars = values.view(np.uint8).reshape(n, -1)
+    h = np.full(n, 0xcbf29ce484222325, dtype=np.uint64)
+    prime = np.uint64(0x100000001b3)
+    for k in range(chars.shape[1]):
+        h ^= chars[:, k]
+        h *= prime
+    _, first, inverse = np.unique(h, return_index=True, return_inverse=True)
+    if not np.array_equal(values[first][inverse], values):
+        _, first, inverse = np.unique(values, return_index=True,
+                                      return_inverse=True)
+
+    order = np.argsort(first, kind="stable")
+    rank = np.empty(len(order), dtype=np.intc)
+    rank[order] = np.arange(len(order), dtype=np.intc)
+    # quoted fields keep doubled quotes until decoded
+    return (rank[inverse.ravel()],
+            [name.decode("utf-8").replace('""', '"')
+             for name in values[first[order]].tolist()])
+
+
+def _field_bounds(data, ncols):
+    """
+    Tokenize CSV bytes. Returns (starts, ends) arrays of shape
+    (rows, ncols) with each field's byte range, including any
+    surrounding quotes (see _unquote). Commas and newlines inside quoted
+    fields are not delimiters: a byte is quoted when an odd number of
+    quote characters precede it. Blank lines are skipped; a row with a
+    different number of fields raises ValueError.
+    """
+    if not len(data):
+        empty = np.zeros((0, ncols), dtype=np.intp)
+        return empty, empty
+    seps = np.flatnonzero((data == ord(",")) | (data == ord("\n")))
+    quotes = np.flatnonzero(data == ord('"'))
+    if len(quotes):
+        # quotes before each candidate: bin quotes by the candidate that
+        # follows them, then a running count
+        before = np.bincount(np.searchsorted(seps, quotes),
+                             minlength=len(seps) + 1)[:len(seps)]
+        seps = seps[np.cumsum(before, dtype=np.uint8) & 1 == 0]
+    row_end = data[seps] == ord("\n")
+    if data[-1] != ord("\n"):
+        seps = np.append(seps, len(data))
+        row_end = np.append(row_end, True)
+
+    ends = seps
+    starts = np.concatenate(([0], seps[:-1] + 1))
+    if len(seps) % ncols == 0 and \
+            np.count_nonzero(row_end) == len(seps) // ncols and \
+            row_end[ncols - 1::ncols].all():
+        # every row has ncols fields and there are no blank lines
+        return starts.reshape(-1, ncols), ends.reshape(-1, ncols)
+
+    # row number of each field, and fields per row
+    row = np.concatenate(([0], np.cumsum(row_end[:-1])))
+    counts = np.bincount(row)
+    blank = (counts == 1) & (ends[row_end] - starts[row_end] <=
+                             (data[np.maximum(ends[row_end] - 1, 0)] ==
+                              ord("\r")))
+    keep = ~blank[row]
+    counts = counts[~blank]
+    bad = np.flatnonzero(counts != ncols)
+    if len(bad):
+        raise ValueError(f"data row {int(bad[0]) + 1} has "
+                         f"{int(counts[bad[0]])} fields, expected {ncols}")
+    return starts[keep].reshape(-1, ncols), ends[keep].reshape(-1, ncols)
+
+
+def _unquote(data, starts, ends, last=False):
+    """
+    Return the byte ranges of one column's fields without surrounding
+    quotes, and without the CR of a CRLF line end for the last column.
+    """
+    if last:
+        ends = ends - ((ends > starts) & (data[ends - 1] == ord("\r")))
+    last_byte = len(data) - 1
+    opened = (ends > starts) & (data[np.minimum(starts, last_byte)]
+                                == ord('"'))
+    closed = opened & (ends - starts >= 2) & (data[ends - 1] == ord('"'))
+    return starts + opened, ends - closed
+
+
+def _gather(data, starts, width):
+    """
+    Return a (fields x width) uint8 array of the width bytes at each
+    start, zero past the end of data. Rows are copied from a zero-copy
+    view of all width-byte windows instead of through a
+    (fields x width) index array.
+    """
+    if width > len(data):
+        data = np.concatenate((data, np.zeros(width, dtype=np.uint8)))
+    windows = sliding_window_view(data, width)
+    chars = windows[np.minimum(starts, len(windows) - 1)]
+    for i in np.flatnonzero(starts > len(windows) - 1).tolist():
+        # starts within the last width bytes
+        tail = data[starts[i]:]
+        chars[i, :len(tail)] = tail
+        chars[i, len(tail):] = 0
+    return chars
+
+
+def _field_bytes(data, starts, ends):
+    """Gather byte ranges into a fixed-width bytes array ("S" dtype)."""
+    lengths = ends - starts
+    width = max(int(lengths.max()) if len(lengths) else 0, 1)
+    chars = _gather(data, starts, width)
+    chars[np.arange(width) >= lengths[:, None]] = 0
+    return chars.view(f"S{width}").ravel()
+
+
+def _column_years(data, starts, ends):
+    """
+    Vectorized get_year over the date fields at starts..ends.
+
+    Dates starting with four digits followed by "-" or the end of the
+    field are decoded from their bytes; other values that could hold a
+    number fall back to get_year().
+    """
+    n = len(starts)
+    years = np.full(n, MISSING_YEAR, dtype=np.intc)
+    lengths = ends - starts
+    fast = lengths >= 4
+    chars = _gather(data, starts, 5).astype(np.intc)
+    digits = chars[:, :4] - ord("0")
+    fast &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+    fast &= (lengths == 4) | (chars[:, 4] == ord("-"))
+    years[fast] = digits[fast] @ np.array([1000, 100, 10, 1],
+                                          dtype=np.intc)
+    # int() also accepts leading whitespace and a sign
+    maybe = ~fast & (lengths > 0) & (((chars[:, 0] >= ord("0")) &
+                                      (chars[:, 0] <= ord("9"))) |
+                                     np.isin(chars[:, 0], list(b" \t+-")))
+    for i in np.flatnonzero(maybe).tolist():
+        text = bytes(data[starts[i]:ends[i]]).decode("utf-8", "replace")
+        year = get_year(text)
+        if year is not None:
+            years[i] = year
+    return years
+
+
+def load_columns(csv_path=None):
+    """
+    Load patent data from CSV file into a PatentColumns.
+
+    The file is read in one piece and tokenized with array operations
+    (see _field_bounds); only the four analyzed columns are extracted
+    and they are dictionary-encoded with np.unique, so no Python code
+    runs per row.
+    """
+    _require_numpy()
     if csv_path is None:
-        csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
-                                "energy_patent_acquisitions.csv")
+        csv_path = _default_csv_path()
 
     if not os.path.exists(csv_path):
         print(f"ERROR: Cannot find {csv_path}")
         print("The CSV file must be in the same directory as this script.")
         sys.exit(1)
 
-    records = []
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            records.append(row)
+    with open(csv_path, "rb") as f:
+        head = f.readline()
+        data = np.frombuffer(f.read(), dtype=np.uint8)
+    header = next(csv.reader([head.decode("utf-8-sig")]), [])
+    missing = [name for name in COLUMN_FIELDS if name not in header]
+    if missing:
+        print(f"ERROR: {csv_path} has no {', '.join(missing)} column")
+        sys.exit(1)
+
+    try:
+        starts, ends = _field_bounds(data, len(header))
+    except ValueError as e:
+        print(f"ERROR: Cannot parse {csv_path}: {e}")
+        sys.exit(1)
+
+    def column(name):
+        i = header.index(name)
+        return _unquote(data, np.ascontiguousarray(starts[:, i]),
+                        np.ascontiguousarray(ends[:, i]),
+                        i == len(header) - 1)
+
+    assignee_codes, assignees = _encode(
+        _field_bytes(data, *column("original_assignee")))
+    holder_codes, holders = _encode(
+        _field_bytes(data, *column("current_holder")))
+    status_codes, statuses = _encode(_field_bytes(data, *column("status")))
+    return PatentColumns(
+        _column_years(data, *column("filing_date")),
+        assignee_codes, assignees,
+        holder_codes, holders,
+        status_codes, statuses,
+    )
+
 
-    return records
+def load_columns_cached(csv_path=None, cache_dir=None):
+    """
+    Load a PatentColumns through the on-disk column cache.
+
+    Returns (columns, hit). On a hit the arrays are memory-mapped from the
+    cache file and the CSV is not parsed; on a miss the CSV is parsed with
+    load_columns() and the cache is rewritten.
+    """
+    _require_numpy()
+    if csv_path is None:
+        csv_path = _default_csv_path()
+    if not os.path.exists(csv_path):
+        return load_columns(csv_path), False
+
+    cache_path = column_cache.cache_path_for(csv_path, "patent_pattern",
+                                             cache_dir)
+    cached = column_cache.lookup(csv_path, cache_path)
+    if cached is not None:
+        meta, arrays = cached
+        return PatentColumns(
+            arrays["years"],
+            arrays["assignee_codes"], meta["assignees"],
+            arrays["holder_codes"], meta["holders"],
+            arrays["status_codes"], meta["statuses"],
+        ), True
+
+    key = column_cache.source_key(csv_path)
+    columns = load_columns(csv_path)
+    column_cache.write_cache(
+        cache_path, key,
+        {
+            "years": columns.years,
+            "assignee_codes": columns.assignee_codes,
+            "holder_codes": columns.holder_codes,
+            "status_codes": columns.status_codes,
+        },
+        {
+            "assignees": columns.assignees,
+            "holders": columns.holders,
+            "statuses": columns.statuses,
+        },
+    )
+    return columns, False
 
 
 def get_year(date_str):
@@ -52,60 +382,410 @@ def get_year(date_str):
         return None
 
 
-def analyze_ownership(records):
-    """Analyze patent ownership patterns over time."""
-    # Group by filing year
-    by_year = defaultdict(list)
-    for r in records:
+class OwnershipAccumulator:
+    """
+    Single-pass accumulator behind analyze_ownership.
+
+    Every statistic is filled from one visit per record, so the input can
+    be a generator. With keep_records=False nothing per-row is retained
+    and memory depends only on the number of distinct years, assignees,
+    holders and statuses.
+    """
+
+    def __init__(self, keep_records=True):
+        self.keep_records = keep_records
+        self.by_year = defaultdict(list)
+        self.assignees_by_year = defaultdict(set)
+        self.pre_2000 = set()
+        self.transition = set()
+        self.post_2001 = set()
+        self.all_assignees = set()
+        self.current_holders = defaultdict(int)
+        self.transfers = set()      # (original assignee, current holder)
+        self.status_counts = defaultdict(int)
+        self.filings_per_year = defaultdict(int)
+        self.record_count = 0
+
+    def add(self, r):
+        """Fold one record into every accumulator."""
         year = get_year(r["filing_date"])
+        assignee = r["original_assignee"]
+
+        self.record_count += 1
+        self.all_assignees.add(assignee)
+
         if year:
-            by_year[year].append(r)
+            if self.keep_records:
+                self.by_year[year].append(r)
+            self.assignees_by_year[year].add(assignee)
+            self.filings_per_year[year] += 1
 
-    # Track unique assignees per period
-    pre_2000 = set()
-    transition = set()
-    post_2001 = set()
+        if year is not None:
+            if year < 2000:
+                self.pre_2000.add(assignee)
+            elif year <= 2001:
+                self.transition.add(assignee)
+            else:
+                self.post_2001.add(assignee)
 
-    for r in records:
-        year = get_year(r["filing_date"])
-        if year is None:
-            continue
+        holder = r["current_holder"]
+        self.current_holders[holder] += 1
+        if holder and holder != assignee:
+            self.transfers.add((assignee, holder))
+        self.status_counts[r["status"]] += 1
 
-        assignee = r["original_assignee"]
+    def update(self, records):
+        """Fold an iterable of records, consuming it once."""
+        for r in records:
+            self.add(r)
+        return self
+
+    def merge(self, other):
+        """
+        Fold another accumulator into this one.
+
+        Merging partials in input order gives the same result, including
+        first-seen key order, as one accumulator over the concatenated rows.
+        """
+        for year, rows in other.by_year.items():
+            self.by_year[year].extend(rows)
+        for year, names in other.assignees_by_year.items():
+            self.assignees_by_year[year] |= names
+        self.pre_2000 |= other.pre_2000
+        self.transition |= other.transition
+        self.post_2001 |= other.post_2001
+        self.all_assignees |= other.all_assignees
+        for holder, count in other.current_holders.items():
+            self.current_holders[holder] += count
+        self.transfers |= other.transfers
+        for status, count in other.status_counts.items():
+            self.status_counts[status] += count
+        for year, count in other.filings_per_year.items():
+            self.filings_per_year[year] += count
+        self.record_count += other.record_count
+        return self
 
-        if year < 2000:
-            pre_2000.add(assignee)
-        elif year <= 2001:
-            transition.add(assignee)
+    def state(self):
+        """
+        Return the aggregates as a JSON-serializable dict.
+
+        Only accumulators built with keep_records=False can be persisted;
+        from_state() restores one that continues exactly where this one
+        stopped.
+        """
+        if self.keep_records:
+            raise ValueError("cannot persist an accumulator that keeps "
+                             "records")
+        return {
+            "assignees_by_year": [[year, sorted(names)] for year, names
+                                  in self.assignees_by_year.items()],
+            "pre_2000": sorted(self.pre_2000),
+            "transition": sorted(self.transition),
+            "post_2001": sorted(self.post_2001),
+            "all_assignees": sorted(self.all_assignees),
+            "current_holders": list(self.current_holders.items()),
+            "transfers": sorted(self.transfers),
+            "status_counts": list(self.status_counts.items()),
+            "filings_per_year": list(self.filings_per_year.items()),
+            "record_count": self.record_count,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an accumulator (keep_records=False) from state()."""
+        acc = cls(keep_records=False)
+        for year, names in state["assignees_by_year"]:
+            acc.assignees_by_year[year] = set(names)
+        acc.pre_2000 = set(state["pre_2000"])
+        acc.transition = set(state["transition"])
+        acc.post_2001 = set(state["post_2001"])
+        acc.all_assignees = set(state["all_assignees"])
+        acc.current_holders.update(state["current_holders"])
+        acc.transfers = set(map(tuple, state["transfers"]))
+        acc.status_counts.update(state["status_counts"])
+        acc.filings_per_year.update(state["filings_per_year"])
+        acc.record_count = state["record_count"]
+        return acc
+
+    def result(self):
+        """Return the analysis dict in the shape analyze_ownership uses."""
+        filings_per_year = self.filings_per_year
+
+        # Pre and post acquisition filing rates
+        pre_acq_years = [y for y in filings_per_year if y < ACQUISITION_YEAR]
+        post_acq_years = [y for y in filings_per_year
+                          if y > ACQUISITION_YEAR]
+
+        pre_avg = (sum(filings_per_year[y] for y in pre_acq_years) /
+                   len(pre_acq_years)) if pre_acq_years else 0
+        post_avg = (sum(filings_per_year[y] for y in post_acq_years) /
+                    len(post_acq_years)) if post_acq_years else 0
+
+        if pre_avg > 0:
+            decline_pct = ((pre_avg - post_avg) / pre_avg) * 100
         else:
-            post_2001.add(assignee)
+            decline_pct = 0
 
-    # Count current holders
-    current_holders = defaultdict(int)
-    for r in records:
-        holder = r["current_holder"]
-        current_holders[holder] += 1
+        analysis = {
+            "by_year": dict(self.by_year),
+            "assignees_by_year": dict(self.assignees_by_year),
+            "pre_2000_assignees": self.pre_2000,
+            "transition_assignees": self.transition,
+            "post_2001_assignees": self.post_2001,
+            "all_assignees": self.all_assignees,
+            "current_holders": dict(self.current_holders),
+            "transfers": self.transfers,
+            "status_counts": dict(self.status_counts),
+            "filings_per_year": dict(filings_per_year),
+            "pre_avg_filings": pre_avg,
+            "post_avg_filings": post_avg,
+            "decline_pct": decline_pct,
+            "record_count": self.record_count,
+        }
+        if not self.keep_records:
+            del analysis["by_year"]
+        return analysis
+
+
+def analyze_ownership(records, keep_records=True):
+    """
+    Analyze patent ownership patterns over time.
+
+    Makes a single pass over records, which may be any iterable including
+    the iter_records() generator. Pass keep_records=False to drop the
+    per-year record lists ("by_year") and run in memory bounded by the
+    number of distinct keys rather than rows.
+    """
+    return OwnershipAccumulator(keep_records).update(records).result()
+
+
+# Persisted state format for analyze_incremental
+STATE_VERSION = 2
+# Bytes hashed at the start and at the end of the analyzed prefix to
+# detect a rewritten source without rereading its history.
+SEAM_BYTES = 1 << 16
+
+
+def _seam_digest(path, offset):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read(min(offset, SEAM_BYTES)))
+        if offset > SEAM_BYTES:
+            f.seek(max(SEAM_BYTES, offset - SEAM_BYTES))
+            h.update(f.read(offset - f.tell()))
+    return h.hexdigest()
+
+
+class _AppendedRows:
+    """
+    Iterate the CSV records that start at byte offset.
+
+    Only newline-terminated lines are read; a partial last line is left
+    for the next run. After iteration, offset is the high-water mark
+    and header holds the column names (read from the file when None).
+    """
+
+    def __init__(self, path, offset=0, header=None):
+        self.path = path
+        self.offset = offset
+        self.header = header
+
+    def _lines(self, f):
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            self.offset += len(line)
+            yield line.decode("utf-8")
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            lines = self._lines(f)
+            if self.header is None:
+                self.header = next(csv.reader(lines), None)
+                if self.header is None:
+                    return
+            yield from csv.DictReader(lines, fieldnames=self.header)
+
+
+def _load_state(state_path, csv_path):
+    """Return saved state if it still describes a prefix of csv_path."""
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        source = state["source"]
+        if state.get("version") != STATE_VERSION or \
+                source["path"] != os.path.abspath(csv_path) or \
+                os.path.getsize(csv_path) < source["offset"] or \
+                _seam_digest(csv_path, source["offset"]) != \
+                source["seam_sha256"]:
+            return None
+        return state
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
 
-    # Count by status
-    status_counts = defaultdict(int)
-    for r in records:
-        status_counts[r["status"]] += 1
+
+def _save_state(state_path, state):
+    directory = os.path.dirname(os.path.abspath(state_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def analyze_incremental(csv_path=None, state_path=None, cache_dir=None):
+    """
+    Analyze an append-only patent CSV, folding in only new rows.
+
+    The accumulator and a high-water mark (byte offset after the last
+    complete line) are persisted in state_path, by default next to the
+    column cache. A rerun resumes from the mark, so its cost depends on
+    the appended bytes, and the result equals analyze_ownership(...,
+    keep_records=False) over the whole file. If the file shrank or the
+    bytes around the mark changed, the analysis starts over.
+
+    Returns (analysis, info) where info has "full" (recomputed from the
+    start), "rows" (records folded in) and "offset".
+    """
+    if csv_path is None:
+        csv_path = _default_csv_path()
+    if not os.path.exists(csv_path):
+        print(f"ERROR: Cannot find {csv_path}")
+        print("The CSV file must be in the same directory as this script.")
+        sys.exit(1)
+    if state_path is None:
+        state_path = column_cache.cache_path_for(
+            csv_path, "patent-state", cache_dir, suffix=".json")
+
+    state = _load_state(state_path, csv_path)
+    if state is None:
+        acc = OwnershipAccumulator(keep_records=False)
+        rows = _AppendedRows(csv_path)
+    else:
+        acc = OwnershipAccumulator.from_state(state["accumulator"])
+        rows = _AppendedRows(csv_path, state["source"]["offset"],
+                             state["source"]["header"])
+    start = rows.offset
+    before = acc.record_count
+    acc.update(rows)
+
+    if state is None or rows.offset != start:
+        _save_state(state_path, {
+            "version": STATE_VERSION,
+            "source": {
+                "path": os.path.abspath(csv_path),
+                "offset": rows.offset,
+                "header": rows.header,
+                "seam_sha256": _seam_digest(csv_path, rows.offset),
+            },
+            "accumulator": acc.state(),
+        })
+    return acc.result(), {"full": state is None,
+                          "rows": acc.record_count - before,
+                          "offset": rows.offset}
+
+
+def expand_inputs(spec):
+    """
+    Resolve a --file argument to an ordered list of CSV shards.
+
+    A directory yields its *.csv files, a glob pattern (** allowed) its
+    matches, and anything else is taken as a single file. Shards are
+    sorted so a sharded run is equivalent to one over their concatenation.
+    """
+    if os.path.isdir(spec):
+        return sorted(glob.glob(os.path.join(spec, "*.csv")))
+    if glob.has_magic(spec):
+        return sorted(p for p in glob.glob(spec, recursive=True)
+                      if os.path.isfile(p))
+    return [spec]
+
+
+def _analyze_shard(csv_path):
+    return OwnershipAccumulator(keep_records=False).update(
+        iter_records(csv_path))
+
+
+def analyze_shards(paths, workers=None):
+    """
+    Analyze CSV shards in a process pool and merge the partial results.
+
+    Returns the same dict as analyze_ownership(keep_records=False) over
+    the shards concatenated in the given order.
+    """
+    total = OwnershipAccumulator(keep_records=False)
+    if len(paths) == 1 or workers == 1:
+        for partial in map(_analyze_shard, paths):
+            total.merge(partial)
+        return total.result()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(_analyze_shard, paths):
+            total.merge(partial)
+    return total.result()
+
+
+def analyze_columns(columns):
+    """
+    Vectorized analyze_ownership over a PatentColumns.
+
+    Returns the same dict as analyze_ownership(records, keep_records=False).
+    """
+    _require_numpy()
+    years = columns.years
+    codes = columns.assignee_codes
+    names = columns.assignees
 
     # Filing rate analysis
-    filings_per_year = defaultdict(int)
-    for r in records:
-        year = get_year(r["filing_date"])
-        if year:
-            filings_per_year[year] += 1
+    dated = years > 0
+    fy_years, fy_counts = np.unique(years[dated], return_counts=True)
+    filings_per_year = dict(zip(fy_years.tolist(), fy_counts.tolist()))
 
-    # Pre and post acquisition filing rates
-    pre_acq_years = [y for y in filings_per_year if y < 2001]
-    post_acq_years = [y for y in filings_per_year if y > 2001]
+    # Distinct (year, assignee) pairs, decoded once per pair
+    n_names = max(len(names), 1)
+    pairs = np.unique(years[dated].astype(np.int64) * n_names + codes[dated])
+    assignees_by_year = defaultdict(set)
+    for year, code in zip(*(a.tolist() for a in np.divmod(pairs, n_names))):
+        assignees_by_year[year].add(names[code])
+
+    # Track unique assignees per period
+    known = years != MISSING_YEAR
 
-    pre_avg = (sum(filings_per_year[y] for y in pre_acq_years) /
-               len(pre_acq_years)) if pre_acq_years else 0
-    post_avg = (sum(filings_per_year[y] for y in post_acq_years) /
-                len(post_acq_years)) if post_acq_years else 0
+    def names_where(mask):
+        return set(names[c] for c in np.unique(codes[mask]).tolist())
+
+    pre_2000 = names_where(known & (years < 2000))
+    transition = names_where(known & (years >= 2000) & (years <= 2001))
+    post_2001 = names_where(known & (years > 2001))
+
+    holder_counts = np.bincount(columns.holder_codes,
+                                minlength=len(columns.holders))
+    status_counts = np.bincount(columns.status_codes,
+                                minlength=len(columns.statuses))
+
+    # Distinct (assignee, holder) pairs where the holder differs
+    holders = columns.holders
+    n_holders = max(len(holders), 1)
+    edges = np.unique(codes.astype(np.int64) * n_holders +
+                      columns.holder_codes)
+    transfers = set()
+    for code, holder in zip(*(a.tolist()
+                              for a in np.divmod(edges, n_holders))):
+        if holders[holder] and holders[holder] != names[code]:
+            transfers.add((names[code], holders[holder]))
+
+    # Pre and post acquisition filing rates
+    pre_counts = fy_counts[fy_years < ACQUISITION_YEAR]
+    post_counts = fy_counts[fy_years > ACQUISITION_YEAR]
+    pre_avg = (int(pre_counts.sum()) / pre_counts.size
+               if pre_counts.size else 0)
+    post_avg = (int(post_counts.sum()) / post_counts.size
+                if post_counts.size else 0)
 
     if pre_avg > 0:
         decline_pct = ((pre_avg - post_avg) / pre_avg) * 100
@@ -113,25 +793,28 @@ def analyze_ownership(records):
         decline_pct = 0
 
     return {
-        "by_year": dict(by_year),
+        "assignees_by_year": dict(assignees_by_year),
         "pre_2000_assignees": pre_2000,
         "transition_assignees": transition,
         "post_2001_assignees": post_2001,
-        "current_holders": dict(current_holders),
-        "status_counts": dict(status_counts),
-        "filings_per_year": dict(filings_per_year),
+        "all_assignees": set(names),
+        "current_holders": dict(zip(holders, holder_counts.tolist())),
+        "transfers": transfers,
+        "status_counts": dict(zip(columns.statuses, status_counts.tolist())),
+        "filings_per_year": filings_per_year,
         "pre_avg_filings": pre_avg,
         "post_avg_filings": post_avg,
         "decline_pct": decline_pct,
+        "record_count": len(columns),
     }
 
 
-def print_text_timeline(records, analysis):
-    """Print a text-based timeline visualization."""
-    print("=" * 70)
-    print("NiMH BATTERY PATENT OWNERSHIP — TIMELINE ANALYSIS")
-    print("=" * 70)
-    print()
+def timeline_lines(analysis):
+    """Yield the lines of the text-based timeline visualization."""
+    yield "=" * 70
+    yield "NiMH BATTERY PATENT OWNERSHIP — TIMELINE ANALYSIS"
+    yield "=" * 70
+    yield ""
 
     # Timeline header
     years = sorted(analysis["filings_per_year"].keys())
@@ -139,171 +822,229 @@ def print_text_timeline(records, analysis):
     max_year = max(years)
 
     # Phase labels
-    print("PHASE 1: DIVERSE INNOVATION (1992-1999)")
-    print("-" * 50)
+    yield "PHASE 1: DIVERSE INNOVATION (1992-1999)"
+    yield "-" * 50
 
     for year in range(min_year, 2000):
         if year in analysis["filings_per_year"]:
             count = analysis["filings_per_year"][year]
-            year_records = analysis["by_year"].get(year, [])
-            assignees = set(r["original_assignee"] for r in year_records)
+            assignees = analysis["assignees_by_year"].get(year, ())
             bar = "#" * (count * 4)
             assignee_str = ", ".join(sorted(assignees))
-            print(f"  {year}  {bar} ({count})  [{assignee_str}]")
+            yield f"  {year}  {bar} ({count})  [{assignee_str}]"
 
-    print()
-    print("PHASE 2: CONSOLIDATION (2000-2001)")
-    print("-" * 50)
-    print("  EVENT: Chevron/Texaco acquires Ovonic Battery Company")
-    print("  EVENT: Cobasys LLC formed (Chevron joint venture)")
-    print()
+    yield ""
+    yield "PHASE 2: CONSOLIDATION (2000-2001)"
+    yield "-" * 50
+    yield "  EVENT: Chevron/Texaco acquires Ovonic Battery Company"
+    yield "  EVENT: Cobasys LLC formed (Chevron joint venture)"
+    yield ""
 
     for year in range(2000, 2002):
         if year in analysis["filings_per_year"]:
             count = analysis["filings_per_year"][year]
-            year_records = analysis["by_year"].get(year, [])
-            assignees = set(r["original_assignee"] for r in year_records)
+            assignees = analysis["assignees_by_year"].get(year, ())
             bar = "#" * (count * 4)
             assignee_str = ", ".join(sorted(assignees))
-            print(f"  {year}  {bar} ({count})  [{assignee_str}]")
+            yield f"  {year}  {bar} ({count})  [{assignee_str}]"
 
-    print()
-    print("PHASE 3: FROZEN (2001-present)")
-    print("-" * 50)
+    yield ""
+    yield "PHASE 3: FROZEN (2001-present)"
+    yield "-" * 50
 
     for year in range(2001, max_year + 1):
         if year in analysis["filings_per_year"]:
             count = analysis["filings_per_year"][year]
-            year_records = analysis["by_year"].get(year, [])
-            assignees = set(r["original_assignee"] for r in year_records)
+            assignees = analysis["assignees_by_year"].get(year, ())
             bar = "#" * (count * 4)
             assignee_str = ", ".join(sorted(assignees))
-            print(f"  {year}  {bar} ({count})  [{assignee_str}]")
+            yield f"  {year}  {bar} ({count})  [{assignee_str}]"
         elif 2002 <= year <= 2005:
-            print(f"  {year}       (0)")
+            yield f"  {year}       (0)"
 
-    print()
-    print()
-    print("=" * 70)
-    print("STATISTICS")
-    print("=" * 70)
-    print()
+    yield ""
+    yield ""
+    yield "=" * 70
+    yield "STATISTICS"
+    yield "=" * 70
+    yield ""
 
     # Ownership consolidation
     pre = analysis["pre_2000_assignees"]
-    print(f"Original patent holders (pre-2000): {len(pre)}")
+    yield f"Original patent holders (pre-2000): {len(pre)}"
     for a in sorted(pre):
-        print(f"    {a}")
-    print()
+        yield f"    {a}"
+    yield ""
 
     # Current ownership
-    print("Current patent holders:")
+    yield "Current patent holders:"
     for holder, count in sorted(analysis["current_holders"].items(),
                                 key=lambda x: -x[1]):
-        print(f"    {holder}: {count} patents")
-    print()
+        yield f"    {holder}: {count} patents"
+    yield ""
 
-    chevron_count = sum(v for k, v in analysis["current_holders"].items()
-                        if "chevron" in k.lower() or "cobasys" in k.lower())
-    total = len(records)
+    # Largest ownership group: current holdings folded into each
+    # holder's ultimate parent along the assignee -> holder transfers
+    from chain_of_title import OwnershipGroups
+    groups = OwnershipGroups()
+    for holder, count in analysis["current_holders"].items():
+        groups.file(holder, count)
+    for assignee, holder in sorted(analysis["transfers"]):
+        groups.transfer(assignee, holder)
+    top_holder, top_count = groups.top(1)[0]
+    top_root = groups.find(top_holder)
+    total = analysis["record_count"]
 
-    # Count all unique original assignees across the full dataset
-    all_assignees = set(r["original_assignee"] for r in records)
-    non_chevron_assignees = set(r["original_assignee"] for r in records
-                                if "cobasys" not in r["original_assignee"].lower())
+    # Unique original assignees outside that group
+    other_assignees = set(a for a in analysis["all_assignees"]
+                          if groups.find(a) != top_root)
 
-    print(f"Patent ownership consolidated from "
-          f"{len(non_chevron_assignees)}+ entities to 1.")
-    print(f"Chevron/Cobasys now controls {chevron_count} of {total} patents "
-          f"in this dataset ({(chevron_count/total)*100:.0f}%).")
-    print()
+    yield (f"Patent ownership consolidated from "
+           f"{len(other_assignees)}+ entities to 1.")
+    yield (f"{top_holder} now controls {top_count} of {total} patents "
+           f"in this dataset ({(top_count/total)*100:.0f}%).")
+    yield ""
 
     # Filing rate — broader industry context
     # This dataset is a sample. USPTO full-class data shows the steeper
     # decline: NiMH EV-specific filings (Class 429/218.2) dropped from
     # ~35/year (1997-2000) to ~2/year (2003-2006).
-    print(f"Average filings per year in this dataset (1992-2000): "
-          f"{analysis['pre_avg_filings']:.1f}")
-    print(f"Average filings per year in this dataset (2002+): "
-          f"{analysis['post_avg_filings']:.1f}")
-    print(f"Dataset decline: {analysis['decline_pct']:.0f}%")
-    print()
-    print("USPTO Class 429/218.2 (NiMH EV-specific applications):")
-    print("  1997-2000 average: ~35 filings/year")
-    print("  2003-2006 average: ~2 filings/year")
-    print("New filings in this category dropped 94% within 3 years.")
-    print()
+    yield (f"Average filings per year in this dataset (1992-2000): "
+           f"{analysis['pre_avg_filings']:.1f}")
+    yield (f"Average filings per year in this dataset (2002+): "
+           f"{analysis['post_avg_filings']:.1f}")
+    yield f"Dataset decline: {analysis['decline_pct']:.0f}%"
+    yield ""
+    yield "USPTO Class 429/218.2 (NiMH EV-specific applications):"
+    yield "  1997-2000 average: ~35 filings/year"
+    yield "  2003-2006 average: ~2 filings/year"
+    yield "New filings in this category dropped 94% within 3 years."
+    yield ""
 
     # Patent status
-    print("Patent status breakdown:")
+    yield "Patent status breakdown:"
     for status, count in sorted(analysis["status_counts"].items()):
-        print(f"    {status}: {count}")
-    print()
+        yield f"    {status}: {count}"
+    yield ""
 
     # Key patent
-    print("-" * 70)
-    print("KEY PATENT: US6,413,670")
-    print("-" * 70)
-    print()
-    print("Filed: 2000-01-18")
-    print("Title: High capacity NiMH battery with 150+ mile range for")
-    print("       electric vehicles")
-    print("Original assignee: Ovonic Battery Company")
-    print("Current holder: Cobasys LLC (Chevron)")
-    print("Status: inactive")
-    print()
-    print("This patent described a NiMH battery system capable of powering")
-    print("a full-size electric vehicle for over 150 miles on a single")
-    print("charge. It was filed in 2000. It was acquired by a petroleum")
-    print("company in 2001. It was never commercially licensed for electric")
-    print("vehicle applications.")
-    print()
+    yield "-" * 70
+    yield "KEY PATENT: US6,413,670"
+    yield "-" * 70
+    yield ""
+    yield "Filed: 2000-01-18"
+    yield "Title: High capacity NiMH battery with 150+ mile range for"
+    yield "       electric vehicles"
+    yield "Original assignee: Ovonic Battery Company"
+    yield "Current holder: Cobasys LLC (Chevron)"
+    yield "Status: inactive"
+    yield ""
+    yield "This patent described a NiMH battery system capable of powering"
+    yield "a full-size electric vehicle for over 150 miles on a single"
+    yield "charge. It was filed in 2000. It was acquired by a petroleum"
+    yield "company in 2001. It was never commercially licensed for electric"
+    yield "vehicle applications."
+    yield ""
 
     # Cross-reference
-    print("=" * 70)
-    print("CROSS-REFERENCE")
-    print("=" * 70)
-    print()
-    print("Same pattern appears in pharmaceuticals.")
-    print()
-    print("Search: FTC v. Actavis, Inc., 570 U.S. 136 (2013)")
-    print()
-    print("Brand-name pharmaceutical companies pay generic manufacturers")
-    print("NOT to produce competing drugs. The Supreme Court ruled these")
-    print("'pay-for-delay' agreements could violate antitrust law.")
-    print("The FTC estimated they cost consumers $3.5 billion per year.")
-    print()
-    print("The mechanism differs. The output is the same:")
-    print("an entity with market power acquires or suppresses competing")
-    print("technology to protect existing revenue streams.")
-    print()
-    print("CROSS-REFERENCE: Same pattern appears in pharma. "
-          "Search: FTC v. Actavis, 570 U.S. 136")
-    print()
-    print("CASE REFERENCE: 7.1, 7.2")
-
-
-def print_csv_output(records, analysis):
-    """Print analysis results in CSV format."""
-    print("period,metric,value")
-    print(f"pre_2000,unique_assignees,{len(analysis['pre_2000_assignees'])}")
-    print(f"2000_2001,unique_assignees,"
-          f"{len(analysis['transition_assignees'])}")
-    print(f"post_2001,unique_assignees,"
-          f"{len(analysis['post_2001_assignees'])}")
-    print(f"pre_2000,avg_filings_per_year,"
-          f"{analysis['pre_avg_filings']:.1f}")
-    print(f"post_2001,avg_filings_per_year,"
-          f"{analysis['post_avg_filings']:.1f}")
-    print(f"overall,filing_decline_pct,{analysis['decline_pct']:.0f}")
+    yield "=" * 70
+    yield "CROSS-REFERENCE"
+    yield "=" * 70
+    yield ""
+    yield "Same pattern appears in pharmaceuticals."
+    yield ""
+    yield "Search: FTC v. Actavis, Inc., 570 U.S. 136 (2013)"
+    yield ""
+    yield "Brand-name pharmaceutical companies pay generic manufacturers"
+    yield "NOT to produce competing drugs. The Supreme Court ruled these"
+    yield "'pay-for-delay' agreements could violate antitrust law."
+    yield "The FTC estimated they cost consumers $3.5 billion per year."
+    yield ""
+    yield "The mechanism differs. The output is the same:"
+    yield "an entity with market power acquires or suppresses competing"
+    yield "technology to protect existing revenue streams."
+    yield ""
+    yield ("CROSS-REFERENCE: Same pattern appears in pharma. "
+           "Search: FTC v. Actavis, 570 U.S. 136")
+    yield ""
+    yield "CASE REFERENCE: 7.1, 7.2"
+
+
+def print_text_timeline(records, analysis):
+    """Print a text-based timeline visualization."""
+    report_writer.write_lines(timeline_lines(analysis))
+
+
+REPORT_HEADER = ("period", "metric", "value")
+
+
+def report_rows(analysis):
+    """Yield the (period, metric, value) rows of the machine reports."""
+    yield ("pre_2000", "unique_assignees",
+           len(analysis["pre_2000_assignees"]))
+    yield ("2000_2001", "unique_assignees",
+           len(analysis["transition_assignees"]))
+    yield ("post_2001", "unique_assignees",
+           len(analysis["post_2001_assignees"]))
+    yield ("pre_2000", "avg_filings_per_year",
+           round(float(analysis["pre_avg_filings"]), 1))
+    yield ("post_2001", "avg_filings_per_year",
+           round(float(analysis["post_avg_filings"]), 1))
+    yield ("overall", "filing_decline_pct", round(analysis["decline_pct"]))
 
     for status, count in sorted(analysis["status_counts"].items()):
-        print(f"current,status_{status},{count}")
+        yield ("current", f"status_{status}", count)
 
     for holder, count in sorted(analysis["current_holders"].items(),
                                 key=lambda x: -x[1]):
-        safe_holder = holder.replace(",", " /")
-        print(f"current,holder_{safe_holder},{count}")
+        yield ("current", f"holder_{holder}", count)
+
+
+def print_csv_output(records, analysis, fmt="csv"):
+    """Print analysis results as csv, jsonl or binary rows."""
+    report_writer.write_rows(fmt, REPORT_HEADER, report_rows(analysis),
+                             {"report": "patent_pattern"})
+
+
+def render_report(analysis, fmt="text", records=None):
+    """Write the report for analysis in one of report_writer.FORMATS."""
+    if fmt == "text":
+        print_text_timeline(records, analysis)
+    else:
+        print_csv_output(records, analysis, fmt)
+
+
+def _report_refresh(info):
+    how = "full analysis" if info["full"] else "appended"
+    print(f"incremental: {how}, {info['rows']} rows folded in "
+          f"(offset {info['offset']})", file=sys.stderr)
+
+
+def watch(csv_path, state_path, cache_dir, interval, render):
+    """
+    Re-run analyze_incremental whenever csv_path changes (size or mtime)
+    and pass each refreshed analysis to render. Runs until interrupted.
+    """
+    csv_path = csv_path or _default_csv_path()
+    last = None
+    try:
+        while True:
+            try:
+                st = os.stat(csv_path)
+                current = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                # being replaced; keep the last report until it is back
+                current = last
+            if current != last:
+                analysis, info = analyze_incremental(csv_path, state_path,
+                                                     cache_dir)
+                if last is None or info["full"] or info["rows"]:
+                    _report_refresh(info)
+                    render(analysis)
+                last = current
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
 
 
 def main():
@@ -314,27 +1055,211 @@ def main():
     )
     parser.add_argument(
         "--output", "-o",
-        choices=["text", "csv"],
+        choices=report_writer.FORMATS,
         default="text",
-        help="Output format: text (default) or csv"
+        help="Output format: text (default), csv, jsonl, or binary "
+             "(columns in the column cache layout, see report_writer.py)"
     )
     parser.add_argument(
         "--file", "-f",
         type=str,
         default=None,
-        help="Path to CSV data file (default: energy_patent_acquisitions.csv "
+        help="Path to CSV data file, or a directory or glob of CSV shards "
+             "analyzed in parallel (default: energy_patent_acquisitions.csv "
              "in the same directory)"
     )
+    parser.add_argument(
+        "--workers", "-j",
+        type=int,
+        default=None,
+        help="Worker processes for sharded input (default: CPU count)"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Hold rows as slotted records with interned strings instead "
+             "of dicts (lower memory for large files)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the CSV in a single pass without holding rows in "
+             "memory (for full USPTO class dumps)"
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Load typed NumPy columns and run the vectorized analysis "
+             "(requires numpy)"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse the parsed dataset from the on-disk column cache when "
+             "the CSV is unchanged (implies --columnar; hit/miss is "
+             "reported on stderr)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory for --cache files (default: $AETHER_CACHE_DIR or "
+             "~/.cache/aether)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Persist the analysis with a high-water mark and on later "
+             "runs fold in only rows appended since (append-only feeds)"
+    )
+    parser.add_argument(
+        "--state",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="State file for --incremental (default: in the --cache-dir "
+             "directory)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and refresh the report whenever the CSV grows "
+             "(implies --incremental)"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Seconds between size checks in --watch mode (default: 5)"
+    )
+    parser.add_argument(
+        "--resolve-names",
+        action="store_true",
+        help="Map assignee and holder spellings to canonical names "
+             "(n-gram fuzzy matching, see entity_names.py) before analysis"
+    )
+    parser.add_argument(
+        "--names",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Persisted canonical-name map for --resolve-names "
+             "(default: entity-names-patent.json in the cache directory)"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="FILE",
+        help="Record wall/CPU time and rows per stage and peak memory as "
+             "a JSON line on stderr, or appended to FILE"
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile, also trace peak Python memory per stage "
+             "(tracemalloc; slows the run)"
+    )
 
     args = parser.parse_args()
 
-    records = load_data(args.file)
-    analysis = analyze_ownership(records)
+    if args.output == "binary" and sys.stdout.isatty():
+        parser.error("--output binary writes binary data; redirect stdout")
+    if (args.columnar or args.cache) and np is None:
+        parser.error("--columnar/--cache require numpy "
+                     "(pip install -r requirements.txt)")
+    if args.watch:
+        args.incremental = True
+    if args.incremental and (args.columnar or args.cache):
+        parser.error("--incremental/--watch use the streaming engine and "
+                     "cannot be combined with --columnar/--cache")
+    if args.resolve_names and (args.columnar or args.cache or
+                               args.incremental):
+        parser.error("--resolve-names works with the row engine only "
+                     "(not --columnar/--cache/--incremental)")
+
+    resolver = None
+    if args.resolve_names:
+        names_path = args.names or entity_names.default_names_path("patent")
+        resolver = entity_names.NameResolver.load(names_path)
+
+    def rows():
+        records = iter_records(args.file, args.compact)
+        if resolver is not None:
+            records = entity_names.resolve_fields(records, resolver,
+                                                  NAME_FIELDS)
+        return records
 
-    if args.output == "csv":
-        print_csv_output(records, analysis)
+    profiler = stage_profile.make_profiler(__file__, args.profile,
+                                           args.profile_memory)
+    records = None
+    shards = expand_inputs(args.file) if args.file else None
+    if shards is not None and shards != [args.file]:
+        if not shards:
+            print(f"ERROR: No CSV files match {args.file}")
+            sys.exit(1)
+        if args.columnar or args.cache:
+            parser.error("--columnar/--cache take a single CSV file")
+        if args.incremental or args.resolve_names:
+            parser.error("--incremental/--watch/--resolve-names take a "
+                         "single CSV file")
+        # parsing happens inside the workers, so it is part of analyze
+        profiler.info.update(mode="shards", inputs=len(shards))
+        with profiler.stage("analyze") as stage:
+            analysis = analyze_shards(shards, args.workers)
+            stage["rows"] = analysis["record_count"]
+    elif args.cache:
+        profiler.info["mode"] = "cache"
+        with profiler.stage("load") as stage:
+            columns, hit = load_columns_cached(args.file, args.cache_dir)
+            stage.update(rows=len(columns.years), cache_hit=hit)
+        print(f"cache {'hit' if hit else 'miss'}: "
+              f"{args.file or _default_csv_path()}", file=sys.stderr)
+        with profiler.stage("analyze") as stage:
+            analysis = analyze_columns(columns)
+            stage["rows"] = analysis["record_count"]
+    elif args.columnar:
+        profiler.info["mode"] = "columnar"
+        with profiler.stage("parse") as stage:
+            columns = load_columns(args.file)
+            stage["rows"] = len(columns.years)
+        with profiler.stage("analyze") as stage:
+            analysis = analyze_columns(columns)
+            stage["rows"] = analysis["record_count"]
+    elif args.watch:
+        watch(args.file, args.state, args.cache_dir, args.interval,
+              lambda analysis: render_report(analysis, args.output))
+        return
+    elif args.incremental:
+        profiler.info["mode"] = "incremental"
+        with profiler.stage("analyze") as stage:
+            analysis, info = analyze_incremental(args.file, args.state,
+                                                 args.cache_dir)
+            stage.update(rows=info["rows"], full=info["full"])
+        _report_refresh(info)
+    elif args.stream:
+        # rows are parsed and folded in one pass, so parse is part of
+        # analyze
+        profiler.info["mode"] = "stream"
+        with profiler.stage("analyze") as stage:
+            analysis = analyze_ownership(rows(), keep_records=False)
+            stage["rows"] = analysis["record_count"]
     else:
-        print_text_timeline(records, analysis)
+        profiler.info["mode"] = "compact" if args.compact else "records"
+        with profiler.stage("parse") as stage:
+            records = list(rows())
+            stage["rows"] = len(records)
+        with profiler.stage("analyze") as stage:
+            analysis = analyze_ownership(records)
+            stage["rows"] = analysis["record_count"]
+
+    if resolver is not None:
+        resolver.save(names_path)
+
+    with profiler.stage("render"):
+        render_report(analysis, args.output, records)
+    profiler.emit(args.profile)
 
 
 if __name__ == "__main__":
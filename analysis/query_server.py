@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+QUERY SERVER — DATASETS KEPT WARM FOR DASHBOARDS AND SCRIPTS
+
+A long-lived asyncio HTTP server, on localhost or a Unix socket. It
+loads and analyzes the patent CSV and the career records once and
+answers report queries from memory, instead of each caller starting
+patent_pattern.py or regulatory_capture_index.py and paying for
+interpreter startup, parsing and analysis every time.
+
+    GET /patents/timeline                 timeline report
+    GET /careers/summary?division=hem     summary statistics
+    GET /careers/records?division=hem     per-record report
+    GET /status                           datasets and cache counters
+
+Every report takes format=text|csv|jsonl|binary (default text), with
+the same output as the CLIs' -o option. Rendered responses are kept in
+an LRU cache keyed by path and query; a cache miss is rendered in a
+worker thread, so a slow report does not hold up other connections.
+Source files are checked every --interval seconds; a changed file (size
+or mtime) is re-analyzed in a worker thread while the old data keeps
+serving, then swapped in and the response cache is cleared.
+
+Usage:
+    python query_server.py --port 8765
+    curl 'http://127.0.0.1:8765/careers/summary?division=hematology'
+
+    python query_server.py --socket /tmp/aether.sock
+    curl --unix-socket /tmp/aether.sock http://localhost/patents/timeline
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import stat
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlsplit
+
+import patent_pattern
+import regulatory_capture_index as rci
+import report_writer
+
+CONTENT_TYPES = {
+    "text": "text/plain; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+    "binary": "application/octet-stream",
+}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class LRUCache:
+    """Least-recently-used mapping with at most maxsize entries."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0  # bumped by clear()
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self.generation += 1
+
+    def __len__(self):
+        return len(self._data)
+
+
+class Dataset:
+    """
+    A source file and the result of loading it.
+
+    load(path) returns (value, rows). path None means embedded data,
+    which is loaded once and never reloaded.
+    """
+
+    def __init__(self, name, path, load):
+        self.name = name
+        self.path = path
+        self._load = load
+        self.value = None
+        self.rows = 0
+        self.loaded_at = None
+        self.load_seconds = 0.0
+        self._signature = None
+
+    def signature(self):
+        if self.path is None:
+            return None
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return self._signature  # being replaced; keep current data
+        return (st.st_size, st.st_mtime_ns)
+
+    def stale(self):
+        return self.value is None or self.signature() != self._signature
+
+    def reload(self):
+        """Load the source; safe to run in a worker thread."""
+        signature = self.signature()
+        start = time.perf_counter()
+        value, rows = self._load(self.path)
+        self.load_seconds = time.perf_counter() - start
+        self.value, self.rows = value, rows
+        self._signature = signature
+        self.loaded_at = time.time()
+
+    def status(self):
+        return {"path": self.path or "embedded", "rows": self.rows,
+                "loaded_at": self.loaded_at,
+                "load_seconds": round(self.load_seconds, 4)}
+
+
+def load_patents(path):
+    if not os.path.exists(path):
+        # iter_records would exit the whole server
+        raise FileNotFoundError(f"Cannot find {path}")
+    analysis = patent_pattern.analyze_ownership(
+        patent_pattern.iter_records(path), keep_records=False)
+    return analysis, analysis["record_count"]
+
+
+def load_careers(path):
+    if path is None:
+        records = rci.parse_data()
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            records = rci.read_records(f)
+    return rci.CareerDataset(records), len(records)
+
+
+def _render(fmt, lines=None, header=None, rows=None, meta=None):
+    """Render a report as bytes: lines for text, rows otherwise."""
+    if fmt == "binary":
+        out = io.BytesIO()
+        report_writer.write_rows(fmt, header, rows, meta, out)
+        return out.getvalue()
+    out = io.StringIO()
+    if fmt == "text":
+        report_writer.write_lines(lines, out)
+    else:
+        report_writer.write_rows(fmt, header, rows, meta, out)
+    return out.getvalue().encode("utf-8")
+
+
+class QueryServer:
+    """Routes report queries to in-memory datasets through an LRU."""
+
+    def __init__(self, patents_path=None, careers_path=None, cache_size=256):
+        self.patents = Dataset("patents", patents_path or
+                               patent_pattern._default_csv_path(),
+                               load_patents)
+        self.careers = Dataset("careers", careers_path, load_careers)
+        self.datasets = (self.patents, self.careers)
+        self.cache = LRUCache(cache_size)
+        self.requests = 0
+        self.started = time.time()
+        self.routes = {
+            "/patents/timeline": self.patent_timeline,
+            "/careers/summary": self.career_summary,
+            "/careers/records": self.career_records,
+        }
+
+    def load(self):
+        for dataset in self.datasets:
+            dataset.reload()
+
+    async def refresh(self, interval):
+        """Reload changed sources every interval seconds, off the loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            for dataset in self.datasets:
+                if not dataset.stale():
+                    continue
+                try:
+                    await loop.run_in_executor(None, dataset.reload)
+                except Exception as e:  # keep serving the last good data
+                    print(f"WARNING: reload of {dataset.path} failed: "
+                          f"{e!r}", file=sys.stderr)
+                    continue
+                self.cache.clear()
+                print(f"reloaded {dataset.name}: {dataset.rows} rows in "
+                      f"{dataset.load_seconds:.2f}s", file=sys.stderr)
+
+    def patent_timeline(self, fmt, params):
+        analysis = self.patents.value
+        return _render(fmt, patent_pattern.timeline_lines(analysis),
+                       patent_pattern.REPORT_HEADER,
+                       patent_pattern.report_rows(analysis),
+                       {"report": "patent_pattern"})
+
+    def career_summary(self, fmt, params):
+        division = params.get("division") or None
+        stats = rci.summarize(self.careers.value, division)
+        return _render(fmt, rci.summary_lines(stats, division),
+                       rci.SUMMARY_HEADER,
+                       rci.summary_rows(stats, division),
+                       {"report": "regulatory_capture_summary"})
+
+    def career_records(self, fmt, params):
+        division = params.get("division") or None
+        records = self.careers.value
+        return _render(fmt, rci.verbose_lines(records, division),
+                       rci.RECORD_HEADER,
+                       rci.record_rows(records, division),
+                       {"report": "regulatory_capture_records"})
+
+    def status(self):
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "cache": {"entries": len(self.cache), "hits": self.cache.hits,
+                      "misses": self.cache.misses},
+            "datasets": {d.name: d.status() for d in self.datasets},
+        }
+
+    async def respond(self, method, target):
+        """
+        Return (status, content type, body) for one request. Cache misses
+        are rendered in a worker thread, so other connections keep being
+        served meanwhile.
+        """
+        self.requests += 1
+        if method != "GET":
+            return 405, CONTENT_TYPES["text"], b"only GET is supported\n"
+        url = urlsplit(target)
+        if url.path == "/status":
+            body = json.dumps(self.status(), indent=1) + "\n"
+            return 200, "application/json", body.encode("utf-8")
+        handler = self.routes.get(url.path)
+        if handler is None:
+            return 404, CONTENT_TYPES["text"], (
+                f"unknown path {url.path}; try "
+                f"{', '.join(sorted(self.routes))} or /status\n"
+            ).encode("utf-8")
+        params = dict(parse_qsl(url.query))
+        fmt = params.pop("format", "text")
+        if fmt not in report_writer.FORMATS:
+            return 400, CONTENT_TYPES["text"], (
+                f"format must be one of "
+                f"{', '.join(report_writer.FORMATS)}\n").encode("utf-8")
+
+        key = (url.path, fmt, tuple(sorted(params.items())))
+        body = self.cache.get(key)
+        if body is None:
+            generation = self.cache.generation
+            loop = asyncio.get_running_loop()
+            body = await loop.run_in_executor(None, handler, fmt, params)
+            if self.cache.generation == generation:
+                # not rendered from data a reload has since replaced
+                self.cache.put(key, body)
+        return 200, CONTENT_TYPES[fmt], body
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.x requests on one connection (keep-alive)."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip().lower()
+
+                if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+                    status, ctype, body = (400, CONTENT_TYPES["text"],
+                                           b"malformed request\n")
+                    keep_alive = False
+                else:
+                    try:
+                        status, ctype, body = await self.respond(parts[0],
+                                                                 parts[1])
+                    except Exception:
+                        print(f"ERROR: {parts[0]} {parts[1]} failed",
+                              file=sys.stderr)
+                        traceback.print_exc()
+                        status, ctype, body = (500, CONTENT_TYPES["text"],
+                                               b"internal error\n")
+                    connection = headers.get("connection", "")
+                    keep_alive = (connection == "keep-alive" if
+                                  parts[2] == "HTTP/1.0"
+                                  else connection != "close")
+
+                head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                        f"Content-Type: {ctype}\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"Connection: "
+                        f"{'keep-alive' if keep_alive else 'close'}\r\n"
+                        f"\r\n").encode("latin-1")
+                writer.write(head + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(server, host, port, socket_path, interval):
+    if socket_path:
+        listener = await asyncio.start_unix_server(server.handle,
+                                                   path=socket_path)
+        where = socket_path
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        where = f"http://{host}:{port}"
+    print(f"serving on {where}", file=sys.stderr, flush=True)
+    refresher = asyncio.ensure_future(server.refresh(interval))
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        refresher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve patent and regulatory capture reports from "
+                    "memory over local HTTP, reloading when sources change."
+    )
+    parser.add_argument(
+        "--file", "-f",
+        type=str,
+        default=None,
+        help="Path to patent CSV (default: energy_patent_acquisitions.csv "
+             "in the same directory)"
+    )
+    parser.add_argument(
+        "--careers", "-c",
+        type=str,
+        default=None,
+        help="Career records CSV in the RAW_DATA layout of "
+             "regulatory_capture_index.py (default: the embedded dataset)"
+    )
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", "-p", type=int, default=8765,
+                        help="TCP port (default: 8765)")
+    parser.add_argument(
+        "--socket", "-s",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Listen on a Unix socket at PATH instead of TCP"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="Rendered responses kept in the LRU cache (default: 256)"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        help="Seconds between source change checks (default: 2)"
+    )
+
+    args = parser.parse_args()
+
+    for path in (args.file, args.careers):
+        if path and not os.path.exists(path):
+            print(f"ERROR: Cannot find {path}")
+            sys.exit(1)
+    if args.socket and os.path.exists(args.socket):
+        if not stat.S_ISSOCK(os.stat(args.socket).st_mode):
+            print(f"ERROR: {args.socket} exists and is not a socket")
+            sys.exit(1)
+        os.unlink(args.socket)  # left over from a previous run
+
+    server = QueryServer(args.file, args.careers, args.cache_size)
+    server.load()
+    for dataset in server.datasets:
+        print(f"loaded {dataset.name}: {dataset.rows} rows in "
+              f"{dataset.load_seconds:.2f}s", file=sys.stderr)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.socket,
+                          args.interval))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.socket and os.path.exists(args.socket) and \
+                stat.S_ISSOCK(os.stat(args.socket).st_mode):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,9 +24,16 @@ CASE REFERENCE: 5.3, 5.4
 import argparse
 import csv
 import io
+import re
 import sys
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 
+import entity_names
+import report_writer
+import stage_profile
+from compact_records import compact_rows
+
 
 # ============================================================================
 # DATASET
@@ -82,16 +89,39 @@ Diana Watts,Hematology-Oncology,10,2010,Active — still at FDA,N/A,"Current hem
 """
 
 
-def parse_data():
-    """Parse the embedded CSV data into a list of dictionaries."""
-    reader = csv.DictReader(io.StringIO(RAW_DATA.strip()))
-    records = []
-    for row in reader:
-        row["years_at_fda"] = int(row["years_at_fda"])
-        row["departure_year"] = int(row["departure_year"])
-        row["transition_months"] = int(row["transition_months"])
-        records.append(row)
-    return records
+def coerce_record(row):
+    """Convert the integer columns of a CSV row in place and return it."""
+    row["years_at_fda"] = int(row["years_at_fda"])
+    row["departure_year"] = int(row["departure_year"])
+    row["transition_months"] = int(row["transition_months"])
+    return row
+
+
+# Organization names canonicalized by --resolve-names.
+NAME_FIELDS = ("subsequent_employer",)
+
+# Columns whose values repeat across rows; shared between compact records.
+SHARED_FIELDS = ("division", "subsequent_employer", "role_after")
+
+
+def _rows(f, compact):
+    if compact:
+        return compact_rows(csv.reader(f), "CareerRecord", SHARED_FIELDS)
+    return csv.DictReader(f)
+
+
+def parse_data(compact=False):
+    """
+    Parse the embedded CSV data into a list of dictionaries, or of
+    slotted CareerRecord objects with compact=True.
+    """
+    rows = _rows(io.StringIO(RAW_DATA.strip()), compact)
+    return [coerce_record(row) for row in rows]
+
+
+def read_records(f, compact=False):
+    """Parse a CSV file object in the RAW_DATA layout into a list."""
+    return [coerce_record(row) for row in _rows(f, compact)]
 
 
 def filter_by_division(records, division):
@@ -100,192 +130,516 @@ def filter_by_division(records, division):
     return [r for r in records if division_lower in r["division"].lower()]
 
 
+# ============================================================================
+# CLASSIFICATION
+# One set of keywords, compiled once, shared by the summary and the
+# per-record listing so both views always agree.
+# ============================================================================
+
+STATUS_ACTIVE = "ACTIVE AT FDA"
+STATUS_NON_INDUSTRY = "NON-INDUSTRY"
+STATUS_INDUSTRY = "INDUSTRY TRANSITION"
+
+ACTIVE_KEYWORDS = ("active", "still at fda")
+
+NON_INDUSTRY_KEYWORDS = (
+    "retired", "academic", "university", "adjunct",
+    "gates foundation", "friends of cancer",
+    "national cancer institute", "memorial sloan",
+    "private practice", "family leave",
+    "medical writing", "freelance",
+)
+
+
+def _keyword_pattern(keywords):
+    return re.compile("|".join(re.escape(k) for k in keywords),
+                      re.IGNORECASE)
+
+
+_ACTIVE_RE = _keyword_pattern(ACTIVE_KEYWORDS)
+_NON_INDUSTRY_RE = _keyword_pattern(NON_INDUSTRY_KEYWORDS)
+_BOARD_RE = _keyword_pattern(("board",))
+
+
+def classify_record(r):
+    """
+    Return the career status of a record: STATUS_ACTIVE, STATUS_NON_INDUSTRY
+    or STATUS_INDUSTRY. CareerDataset classifies each record once and
+    keeps the results alongside the records.
+    """
+    employer = r["subsequent_employer"]
+    role = r["role_after"]
+
+    if _ACTIVE_RE.search(employer):
+        status = STATUS_ACTIVE
+    elif (_NON_INDUSTRY_RE.search(f"{employer}\n{role}")
+          and not _BOARD_RE.search(role)):
+        status = STATUS_NON_INDUSTRY
+    else:
+        status = STATUS_INDUSTRY
+    return status
+
+
 def identify_revolving_door(records):
     """
     Identify reviewers who left FDA to work for companies whose drugs
     they reviewed or oversaw. Excludes those who retired, stayed at FDA,
     or went to non-industry positions without pharma ties.
     """
-    industry_roles = []
-    non_industry = []
-    still_active = []
+    buckets = {
+        STATUS_INDUSTRY: [],
+        STATUS_NON_INDUSTRY: [],
+        STATUS_ACTIVE: [],
+    }
 
     for r in records:
-        employer = r["subsequent_employer"].lower()
-        role = r["role_after"].lower()
-
-        if "active" in employer or "still at fda" in employer:
-            still_active.append(r)
-        elif any(k in employer or k in role for k in [
-            "retired", "academic", "university", "adjunct",
-            "gates foundation", "friends of cancer",
-            "national cancer institute", "memorial sloan",
-            "private practice", "family leave",
-            "medical writing", "freelance",
-        ]) and "board" not in role:
-            non_industry.append(r)
+        buckets[classify_record(r)].append(r)
+
+    return (buckets[STATUS_INDUSTRY], buckets[STATUS_NON_INDUSTRY],
+            buckets[STATUS_ACTIVE])
+
+
+class CareerDataset:
+    """
+    Parsed career records with lookup indexes, built once.
+
+    - division index: lowercase division -> record positions; partial,
+      case-insensitive lookups scan only the distinct division names and
+      are memoized per query string
+    - departure-year index: positions sorted by departure_year, searched
+      with bisect for year ranges
+    - statuses: classify_record() of each record, by position, and
+      positions per status
+
+    Iterating a dataset yields its records, so it can be passed anywhere
+    a record list is accepted.
+    """
+
+    def __init__(self, records):
+        self.records = list(records)
+        self._division_index = defaultdict(list)
+        self._status_index = defaultdict(list)
+        self.statuses = [classify_record(r) for r in self.records]
+        for i, r in enumerate(self.records):
+            self._division_index[r["division"].lower()].append(i)
+            self._status_index[self.statuses[i]].append(i)
+
+        years = [r["departure_year"] for r in self.records]
+        self._year_order = sorted(range(len(years)), key=years.__getitem__)
+        self._years = [years[i] for i in self._year_order]
+        self._division_cache = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def division_positions(self, division):
+        """Positions of records whose division contains division."""
+        key = division.lower()
+        positions = self._division_cache.get(key)
+        if positions is None:
+            positions = sorted(i for name, found in
+                               self._division_index.items()
+                               if key in name for i in found)
+            self._division_cache[key] = positions
+        return positions
+
+    def year_positions(self, start_year=None, end_year=None):
+        """Positions of records departing in [start_year, end_year]."""
+        lo = 0 if start_year is None else bisect_left(self._years, start_year)
+        hi = (len(self._years) if end_year is None
+              else bisect_right(self._years, end_year))
+        return self._year_order[lo:hi]
+
+    def status_positions(self, *statuses):
+        """Positions of records with any of the given statuses."""
+        if len(statuses) == 1:
+            return self._status_index.get(statuses[0], [])
+        return sorted(i for status in statuses
+                      for i in self._status_index.get(status, []))
+
+    def query(self, division=None, start_year=None, end_year=None,
+              statuses=None, by_year=False):
+        """
+        Return records matching every given condition.
+
+        Records come back in dataset order, or ordered by departure year
+        (stable) when by_year is set. Example:
+
+            dataset.query("hematology", 2001, 2010, [STATUS_INDUSTRY])
+        """
+        return [self.records[i] for i in self._positions(
+            division, start_year, end_year, statuses, by_year)]
+
+    def classified(self, division=None, start_year=None, end_year=None,
+                   statuses=None, by_year=False):
+        """Like query(), but return (record, status) pairs."""
+        return [(self.records[i], self.statuses[i]) for i in self._positions(
+            division, start_year, end_year, statuses, by_year)]
+
+    def _positions(self, division, start_year, end_year, statuses,
+                   by_year):
+        conditions = []
+        if division:
+            conditions.append(self.division_positions(division))
+        if start_year is not None or end_year is not None or by_year:
+            conditions.append(self.year_positions(start_year, end_year))
+        if statuses:
+            conditions.append(self.status_positions(*statuses))
+        if not conditions:
+            return range(len(self.records))
+
+        conditions.sort(key=len)
+        others = [set(c) for c in conditions[1:]]
+        matches = [i for i in conditions[0]
+                   if all(i in other for other in others)]
+        if by_year:
+            rank = {i: n for n, i in enumerate(self._year_order)}
+            matches.sort(key=rank.__getitem__)
+        else:
+            matches.sort()
+        return matches
+
+
+def as_dataset(records):
+    """Return records as a CareerDataset, indexing them if needed."""
+    if isinstance(records, CareerDataset):
+        return records
+    return CareerDataset(records)
+
+
+# ============================================================================
+# SUMMARY STATISTICS
+# ============================================================================
+
+FOCAL_DIVISION = "hematology"
+FOCAL_YEARS = (2001, 2010)
+FAST_TRANSITION_MONTHS = 6
+
+
+class SummaryAccumulator:
+    """
+    Incremental aggregates behind print_summary.
+
+    Records are folded in one at a time and not retained, so the same
+    statistics can be computed over an in-memory list or a stream of
+    any length in constant memory.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.industry = 0
+        self.non_industry = 0
+        self.active = 0
+        self.focal_departed = 0
+        self.focal_industry = 0
+        self.transition_count = 0
+        self.transition_sum = 0
+        self.transition_min = None
+        self.transition_fast = 0
+        self.skipped = 0
+        self.rows_read = 0
+
+    def add(self, r, status=None):
+        """Fold one record (classified unless status is given) in."""
+        if status is None:
+            status = classify_record(r)
+        self.total += 1
+
+        if status == STATUS_ACTIVE:
+            self.active += 1
+            return
+
+        is_industry = status == STATUS_INDUSTRY
+        if is_industry:
+            self.industry += 1
+        else:
+            self.non_industry += 1
+
+        if (FOCAL_DIVISION in r["division"].lower()
+                and FOCAL_YEARS[0] <= r["departure_year"] <= FOCAL_YEARS[1]):
+            self.focal_departed += 1
+            self.focal_industry += is_industry
+
+        months = r["transition_months"]
+        if is_industry and months > 0:
+            self.transition_count += 1
+            self.transition_sum += months
+            if self.transition_min is None or months < self.transition_min:
+                self.transition_min = months
+            if months <= FAST_TRANSITION_MONTHS:
+                self.transition_fast += 1
+
+    def update(self, records):
+        """Fold an iterable of records, consuming it once."""
+        for r in records:
+            self.add(r)
+        return self
+
+    @property
+    def departed(self):
+        return self.industry + self.non_industry
+
+    @property
+    def industry_pct(self):
+        if self.departed > 0:
+            return (self.industry / self.departed) * 100
+        return 0
+
+    @property
+    def transition_mean(self):
+        if self.transition_count:
+            return self.transition_sum / self.transition_count
+        return None
+
+    def progress_line(self):
+        """One-line partial result for long streaming runs."""
+        line = (f"{self.total:,} records, {self.industry:,} of "
+                f"{self.departed:,} departed to industry "
+                f"({self.industry_pct:.1f}%)")
+        if self.transition_count:
+            line += (f", mean transition {self.transition_mean:.1f} months, "
+                     f"fastest {self.transition_min}, "
+                     f"{self.transition_fast:,} within "
+                     f"{FAST_TRANSITION_MONTHS} months")
+        return line
+
+
+def stream_summary(f, division_filter=None, progress_every=0,
+                   resolver=None):
+    """
+    Compute print_summary aggregates from a CSV file object in one pass.
+
+    Rows with unparseable integer fields are counted in .skipped rather
+    than aborting the run. Every progress_every rows a partial result is
+    written to stderr. With an entity_names.NameResolver, employers are
+    canonicalized before classification.
+    """
+    stats = SummaryAccumulator()
+    division_lower = division_filter.lower() if division_filter else None
+
+    for n, row in enumerate(csv.DictReader(f), 1):
+        stats.rows_read = n
+        try:
+            r = coerce_record(row)
+        except (TypeError, ValueError):
+            stats.skipped += 1
         else:
-            industry_roles.append(r)
+            if resolver is not None:
+                r["subsequent_employer"] = resolver.resolve(
+                    r["subsequent_employer"])
+            if (division_lower is None
+                    or division_lower in r["division"].lower()):
+                stats.add(r)
+        if progress_every and n % progress_every == 0:
+            print(f"[progress] {n:,} rows read: {stats.progress_line()}",
+                  file=sys.stderr, flush=True)
+
+    return stats
+
 
-    return industry_roles, non_industry, still_active
+def summarize(records, division_filter=None):
+    """Return the SummaryAccumulator for records in a division."""
+    stats = SummaryAccumulator()
+    for r, status in as_dataset(records).classified(division_filter):
+        stats.add(r, status)
+    return stats
 
 
 def print_summary(records, division_filter=None):
     """Print aggregate statistics."""
-    if division_filter:
-        records = filter_by_division(records, division_filter)
-        if not records:
-            print(f"No records found for division: {division_filter}")
-            return
+    print_summary_stats(summarize(records, division_filter), division_filter)
 
-    division_name = division_filter or "all divisions"
-    industry, non_industry, active = identify_revolving_door(records)
 
-    departed = industry + non_industry
-    total_departed = len(departed)
-    total_to_industry = len(industry)
+def print_summary_stats(stats, division_filter=None):
+    """Print aggregate statistics from a SummaryAccumulator."""
+    report_writer.write_lines(summary_lines(stats, division_filter))
 
-    if total_departed > 0:
-        pct = (total_to_industry / total_departed) * 100
-    else:
-        pct = 0
-
-    print("=" * 70)
-    print("REGULATORY CAPTURE INDEX — FDA REVIEWER CAREER TRANSITIONS")
-    print("=" * 70)
-    print()
-    print(f"Division filter: {division_name}")
-    print(f"Total records: {len(records)}")
-    print(f"Still active at FDA: {len(active)}")
-    print(f"Departed: {total_departed}")
-    print(f"Departed to regulated industry: {total_to_industry}")
-    print(f"Departed to non-industry: {len(non_industry)}")
-    print()
+
+def summary_lines(stats, division_filter=None):
+    """Yield the lines of the aggregate statistics report."""
+    if division_filter and not stats.total:
+        yield f"No records found for division: {division_filter}"
+        return
+
+    division_name = division_filter or "all divisions"
+    total_departed = stats.departed
+    total_to_industry = stats.industry
+    pct = stats.industry_pct
+
+    yield "=" * 70
+    yield "REGULATORY CAPTURE INDEX — FDA REVIEWER CAREER TRANSITIONS"
+    yield "=" * 70
+    yield ""
+    yield f"Division filter: {division_name}"
+    yield f"Total records: {stats.total}"
+    yield f"Still active at FDA: {stats.active}"
+    yield f"Departed: {total_departed}"
+    yield f"Departed to regulated industry: {total_to_industry}"
+    yield f"Departed to non-industry: {stats.non_industry}"
+    yield ""
 
     if total_departed > 0:
-        print(f"{total_to_industry} of {total_departed} {division_name} "
-              f"reviewers ({pct:.1f}%) who left FDA went to work for "
-              f"companies whose drugs they reviewed or oversaw.")
-    print()
+        yield (f"{total_to_industry} of {total_departed} {division_name} "
+               f"reviewers ({pct:.1f}%) who left FDA went to work for "
+               f"companies whose drugs they reviewed or oversaw.")
+    yield ""
 
     # If showing all divisions, also show the hematology-oncology focal stat
     if not division_filter:
-        all_records = parse_data()
-        hem_records = filter_by_division(all_records, "hematology")
-        hem_industry, hem_non, hem_active = identify_revolving_door(hem_records)
-        hem_departed = hem_industry + hem_non
-        if hem_departed:
-            hem_pct = (len(hem_industry) / len(hem_departed)) * 100
-            # Filter by departure year range
-            hem_01_10 = [r for r in hem_departed
-                         if 2001 <= r["departure_year"] <= 2010]
-            hem_01_10_ind = [r for r in hem_industry
-                             if 2001 <= r["departure_year"] <= 2010]
-            if hem_01_10:
-                h_pct = (len(hem_01_10_ind) / len(hem_01_10)) * 100
-                print(f"FOCAL DIVISION — Hematology-Oncology:")
-                print(f"{len(hem_01_10_ind)} of {len(hem_01_10)} "
-                      f"hematology-oncology reviewers ({h_pct:.1f}%) who "
-                      f"left FDA between 2001-2010 went to work for "
-                      f"companies whose drugs they reviewed.")
-        print()
+        if stats.focal_departed:
+            h_pct = (stats.focal_industry / stats.focal_departed) * 100
+            yield f"FOCAL DIVISION — Hematology-Oncology:"
+            yield (f"{stats.focal_industry} of {stats.focal_departed} "
+                   f"hematology-oncology reviewers ({h_pct:.1f}%) who "
+                   f"left FDA between 2001-2010 went to work for "
+                   f"companies whose drugs they reviewed.")
+        yield ""
 
     # Transition time analysis
-    transition_times = [r["transition_months"] for r in industry
-                        if r["transition_months"] > 0]
-    if transition_times:
-        avg_months = sum(transition_times) / len(transition_times)
-        min_months = min(transition_times)
-        print(f"Average time from FDA departure to industry role: "
-              f"{avg_months:.1f} months")
-        print(f"Fastest transition: {min_months} months")
-        fast_transitions = [r for r in industry
-                            if 0 < r["transition_months"] <= 6]
-        print(f"Transitions within 6 months: {len(fast_transitions)} "
-              f"of {len(transition_times)}")
-    print()
+    if stats.transition_count:
+        yield (f"Average time from FDA departure to industry role: "
+               f"{stats.transition_mean:.1f} months")
+        yield f"Fastest transition: {stats.transition_min} months"
+        yield (f"Transitions within 6 months: {stats.transition_fast} "
+               f"of {stats.transition_count}")
+    yield ""
 
     # Cross-reference
-    print("-" * 70)
-    print("CROSS-REFERENCE: STRUCTURAL PARALLEL")
-    print("-" * 70)
-    print()
-    print("This pattern is not unique to pharmaceuticals.")
-    print()
-    print("The Federal Aviation Administration (FAA) delegates aircraft")
-    print("safety certification to employees of the manufacturers being")
-    print("certified. After the 737 MAX crashes (346 dead), investigation")
-    print("revealed that Boeing employees who flagged safety concerns were")
-    print("overruled by Boeing managers — who held FAA-delegated authority.")
-    print()
-    print("The structure is identical: the entity being regulated captures")
-    print("the entity doing the regulating. The mechanism differs.")
-    print("The output is the same.")
-    print()
-    print("CASE REFERENCE: 5.3, 5.4")
+    yield "-" * 70
+    yield "CROSS-REFERENCE: STRUCTURAL PARALLEL"
+    yield "-" * 70
+    yield ""
+    yield "This pattern is not unique to pharmaceuticals."
+    yield ""
+    yield "The Federal Aviation Administration (FAA) delegates aircraft"
+    yield "safety certification to employees of the manufacturers being"
+    yield "certified. After the 737 MAX crashes (346 dead), investigation"
+    yield "revealed that Boeing employees who flagged safety concerns were"
+    yield "overruled by Boeing managers — who held FAA-delegated authority."
+    yield ""
+    yield "The structure is identical: the entity being regulated captures"
+    yield "the entity doing the regulating. The mechanism differs."
+    yield "The output is the same."
+    yield ""
+    yield "CASE REFERENCE: 5.3, 5.4"
 
 
 def print_verbose(records, division_filter=None):
     """Print individual records with full detail."""
-    if division_filter:
-        records = filter_by_division(records, division_filter)
-        if not records:
-            print(f"No records found for division: {division_filter}")
-            return
-
-    print_summary(records if not division_filter else
-                  filter_by_division(parse_data(), division_filter),
-                  division_filter)
-    print()
-    print("=" * 70)
-    print("INDIVIDUAL RECORDS")
-    print("=" * 70)
-
-    # Sort by departure year
-    sorted_records = sorted(records, key=lambda r: r["departure_year"])
-
-    for i, r in enumerate(sorted_records, 1):
+    report_writer.write_lines(verbose_lines(records, division_filter))
+
+
+def verbose_lines(records, division_filter=None):
+    """Yield the lines of the summary followed by every record."""
+    dataset = as_dataset(records)
+    # Sorted by departure year
+    sorted_records = dataset.classified(division_filter, by_year=True)
+    if division_filter and not sorted_records:
+        yield f"No records found for division: {division_filter}"
+        return
+
+    yield from summary_lines(summarize(dataset, division_filter),
+                             division_filter)
+    yield ""
+    yield "=" * 70
+    yield "INDIVIDUAL RECORDS"
+    yield "=" * 70
+
+    for i, (r, status) in enumerate(sorted_records, 1):
         employer = r["subsequent_employer"]
         role = r["role_after"]
 
-        # Determine status
-        if "active" in employer.lower() or "still at fda" in employer.lower():
-            status = "ACTIVE AT FDA"
-        elif any(k in employer.lower() or k in role.lower() for k in [
-            "retired", "academic", "university", "adjunct",
-            "gates foundation", "friends of cancer"
-        ]) and "board" not in role.lower():
-            status = "NON-INDUSTRY"
-        else:
-            status = "INDUSTRY TRANSITION"
-
-        print()
-        print(f"  [{i:02d}] {r['name']}")
-        print(f"       FDA Role: {r['division']} ({r['years_at_fda']} years)")
-        print(f"       Departed: {r['departure_year']}")
-        print(f"       Went to: {employer}")
-        print(f"       New role: {role}")
-        print(f"       Drugs reviewed: {r['drugs_reviewed']}")
+        yield ""
+        yield f"  [{i:02d}] {r['name']}"
+        yield f"       FDA Role: {r['division']} ({r['years_at_fda']} years)"
+        yield f"       Departed: {r['departure_year']}"
+        yield f"       Went to: {employer}"
+        yield f"       New role: {role}"
+        yield f"       Drugs reviewed: {r['drugs_reviewed']}"
 
-        if r["transition_months"] > 0 and status == "INDUSTRY TRANSITION":
-            print(f"       Transition time: {r['transition_months']} months")
+        if r["transition_months"] > 0 and status == STATUS_INDUSTRY:
+            yield f"       Transition time: {r['transition_months']} months"
 
             # Flag notable cases
             if r["name"] == "Scott Gottlieb":
-                print(f"       NOTE: FDA Commissioner -> Pfizer Board of "
-                      f"Directors, transition time: "
-                      f"{r['transition_months']} months")
+                yield (f"       NOTE: FDA Commissioner -> Pfizer Board of "
+                       f"Directors, transition time: "
+                       f"{r['transition_months']} months")
             elif r["transition_months"] <= 3:
-                print(f"       NOTE: Transition completed in "
-                      f"{r['transition_months']} months")
+                yield (f"       NOTE: Transition completed in "
+                       f"{r['transition_months']} months")
+
+        yield f"       Status: {status}"
+
+    yield ""
+    yield "-" * 70
+    yield "END OF RECORDS"
+    yield ""
+    yield "CASE REFERENCE: 5.3, 5.4"
+
 
-        print(f"       Status: {status}")
+SUMMARY_HEADER = ("division", "metric", "value")
+RECORD_HEADER = ("name", "division", "years_at_fda", "departure_year",
+                 "subsequent_employer", "role_after", "drugs_reviewed",
+                 "transition_months", "status")
 
-    print()
-    print("-" * 70)
-    print("END OF RECORDS")
-    print()
-    print("CASE REFERENCE: 5.3, 5.4")
+
+def summary_rows(stats, division_filter=None):
+    """Yield the (division, metric, value) rows of the summary."""
+    division_name = division_filter or "all divisions"
+    metrics = [
+        ("total", stats.total),
+        ("active", stats.active),
+        ("departed", stats.departed),
+        ("departed_industry", stats.industry),
+        ("departed_non_industry", stats.non_industry),
+    ]
+    if stats.departed:
+        metrics.append(("industry_pct", round(stats.industry_pct, 1)))
+    if not division_filter and stats.focal_departed:
+        metrics += [
+            ("focal_departed", stats.focal_departed),
+            ("focal_industry", stats.focal_industry),
+        ]
+    if stats.transition_count:
+        metrics += [
+            ("transition_mean_months", round(stats.transition_mean, 1)),
+            ("transition_min_months", stats.transition_min),
+            ("transitions_within_6_months", stats.transition_fast),
+            ("transition_count", stats.transition_count),
+        ]
+    for metric, value in metrics:
+        yield (division_name, metric, value)
+
+
+def record_rows(records, division_filter=None):
+    """Yield one row per record in RECORD_HEADER order, by year."""
+    for r, status in as_dataset(records).classified(division_filter,
+                                                    by_year=True):
+        yield tuple(r[field] for field in RECORD_HEADER[:-1]) + (status,)
+
+
+def write_summary(stats, division_filter=None, fmt="text"):
+    """Write the summary as the text report or as rows in fmt."""
+    if fmt == "text":
+        print_summary_stats(stats, division_filter)
+    else:
+        report_writer.write_rows(fmt, SUMMARY_HEADER,
+                                 summary_rows(stats, division_filter),
+                                 {"report": "regulatory_capture_summary"})
+
+
+def write_records(records, division_filter=None, fmt="text"):
+    """Write the verbose report, or the record rows in fmt."""
+    if fmt == "text":
+        print_verbose(records, division_filter)
+    else:
+        report_writer.write_rows(fmt, RECORD_HEADER,
+                                 record_rows(records, division_filter),
+                                 {"report": "regulatory_capture_records"})
 
 
 def main():
@@ -307,15 +661,146 @@ def main():
         help="Filter by FDA division (partial match, case-insensitive). "
              "Example: --division hematology"
     )
+    parser.add_argument(
+        "--output", "-o",
+        choices=report_writer.FORMATS,
+        default="text",
+        help="Output format: text (default), csv, jsonl, or binary "
+             "(columns in the column cache layout, see report_writer.py). "
+             "Row formats hold the summary metrics, or one row per record "
+             "with --verbose"
+    )
+
+    parser.add_argument(
+        "--file", "-f",
+        type=str,
+        default=None,
+        help="Read records from a CSV file in the RAW_DATA layout instead "
+             "of the embedded dataset ('-' for stdin). Without --verbose "
+             "the file is streamed in constant memory"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Hold records as slotted objects with interned strings "
+             "instead of dicts (lower memory for large files)"
+    )
+    parser.add_argument(
+        "--progress-every",
+        type=int,
+        default=1_000_000,
+        metavar="N",
+        help="When streaming, report partial results to stderr every N "
+             "rows (default: 1000000; 0 disables)"
+    )
+    parser.add_argument(
+        "--resolve-names",
+        action="store_true",
+        help="Map employer spellings to canonical names (n-gram fuzzy "
+             "matching, see entity_names.py) before classification"
+    )
+    parser.add_argument(
+        "--names",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Persisted canonical-name map for --resolve-names "
+             "(default: entity-names-employer.json in the cache directory)"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="FILE",
+        help="Record wall/CPU time and rows per stage and peak memory as "
+             "a JSON line on stderr, or appended to FILE"
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile, also trace peak Python memory per stage "
+             "(tracemalloc; slows the run)"
+    )
 
     args = parser.parse_args()
 
-    records = parse_data()
+    if args.output == "binary" and sys.stdout.isatty():
+        parser.error("--output binary writes binary data; redirect stdout")
+
+    profiler = stage_profile.make_profiler(__file__, args.profile,
+                                           args.profile_memory)
+
+    resolver = None
+    if args.resolve_names:
+        names_path = args.names or entity_names.default_names_path(
+            "employer")
+        resolver = entity_names.NameResolver.load(names_path)
+
+    def resolved(records):
+        if resolver is None:
+            return records
+        records = list(entity_names.resolve_fields(records, resolver,
+                                                   NAME_FIELDS))
+        resolver.save(names_path)
+        return records
+
+    if args.file:
+        if args.file == "-":
+            source = sys.stdin
+        else:
+            try:
+                source = open(args.file, "r", encoding="utf-8", newline="")
+            except OSError as e:
+                print(f"ERROR: Cannot read {args.file}: {e.strerror}")
+                sys.exit(1)
+        with source:
+            if args.verbose:
+                profiler.info["mode"] = "file-verbose"
+                with profiler.stage("parse") as stage:
+                    records = resolved(read_records(source, args.compact))
+                    stage["rows"] = len(records)
+                with profiler.stage("index") as stage:
+                    records = CareerDataset(records)
+                # the verbose report queries and prints per record
+                with profiler.stage("render"):
+                    write_records(records, args.division, args.output)
+                profiler.emit(args.profile)
+                return
+            # rows are parsed and folded in one pass, so parse is part
+            # of analyze
+            profiler.info["mode"] = "file-stream"
+            with profiler.stage("analyze") as stage:
+                stats = stream_summary(source, args.division,
+                                       args.progress_every, resolver)
+                if resolver is not None:
+                    resolver.save(names_path)
+                stage.update(rows=stats.rows_read, skipped=stats.skipped)
+        if stats.skipped:
+            print(f"WARNING: skipped {stats.skipped} malformed rows",
+                  file=sys.stderr)
+        with profiler.stage("render"):
+            write_summary(stats, args.division, args.output)
+        profiler.emit(args.profile)
+        return
+
+    profiler.info["mode"] = "embedded"
+    with profiler.stage("parse") as stage:
+        records = resolved(parse_data(args.compact))
+        stage["rows"] = len(records)
+    with profiler.stage("index") as stage:
+        records = CareerDataset(records)
 
     if args.verbose:
-        print_verbose(records, args.division)
+        with profiler.stage("render"):
+            write_records(records, args.division, args.output)
     else:
-        print_summary(records, args.division)
+        with profiler.stage("analyze") as stage:
+            stats = summarize(records, args.division)
+            stage["rows"] = stats.total
+        with profiler.stage("render"):
+            write_summary(stats, args.division, args.output)
+    profiler.emit(args.profile)
 
 
 if __name__ == "__main__":
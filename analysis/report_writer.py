@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Buffered report output shared by the analysis CLIs.
+
+Reports are produced as lines (text) or as rows (everything else) and
+written through one ReportWriter, which joins them into large writes
+instead of one print() per line.
+
+Row formats:
+
+    csv       RFC 4180 quoting (ReportDialect), header row first
+    jsonl     one JSON object per row
+    binary    columns in the column_cache.py file layout, so
+              column_cache.read_cache() maps a report straight into
+              NumPy arrays. Int and float columns are stored as int64 /
+              float64; string columns are dictionary-encoded as int32
+              codes, with the dictionary in meta["dictionaries"].
+"""
+
+import csv
+import json
+import struct
+import sys
+from array import array
+
+from column_cache import ALIGN, MAGIC
+
+FORMATS = ("text", "csv", "jsonl", "binary")
+BUFFER_SIZE = 1 << 16
+# array typecode -> NumPy dtype (without byte order)
+DTYPES = {"q": "i8", "d": "f8", "i": "i4"}
+
+
+class ReportDialect(csv.excel):
+    """Excel-compatible CSV with Unix line endings."""
+
+    lineterminator = "\n"
+
+
+class ReportWriter:
+    """
+    Text output buffered into writes of about buffer_size characters.
+
+    Also a file-like target for csv.writer. Call flush() (or use as a
+    context manager) when the report is complete.
+    """
+
+    def __init__(self, stream=None, buffer_size=BUFFER_SIZE):
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+
+    def write(self, text):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def lines(self, lines):
+        """Write an iterable of lines, adding the newlines."""
+        for line in lines:
+            self.write(line + "\n")
+
+    def csv_rows(self, header, rows):
+        writer = csv.writer(self, ReportDialect)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+    def jsonl_rows(self, header, rows):
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+        for row in rows:
+            self.write(dumps(dict(zip(header, row))) + "\n")
+
+    def flush(self):
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+def _column(values):
+    """Return (array, dictionary) for one column of Python values."""
+    if all(isinstance(v, int) for v in values):
+        return array("q", values), None
+    if all(isinstance(v, (int, float)) for v in values):
+        return array("d", values), None
+    index = {}
+    codes = array("i", (index.setdefault(str(v), len(index))
+                        for v in values))
+    return codes, list(index)
+
+
+def _padded(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_binary(stream, header, rows, meta=None):
+    """
+    Write rows as binary columns to a binary stream.
+
+    Needs no seeking, so stream may be a pipe (sys.stdout.buffer).
+    """
+    rows = list(rows)
+    byteorder = "<" if sys.byteorder == "little" else ">"
+    columns = {}
+    dictionaries = {}
+    for i, name in enumerate(header):
+        columns[name], dictionary = _column([row[i] for row in rows])
+        if dictionary is not None:
+            dictionaries[name] = dictionary
+
+    specs = {}
+    offset = 0
+    for name, col in columns.items():
+        specs[name] = {"dtype": byteorder + DTYPES[col.typecode],
+                       "length": len(col), "offset": offset}
+        offset = _padded(offset + len(col) * col.itemsize)
+
+    meta = dict(meta or {}, columns=list(header), dictionaries=dictionaries)
+    header_bytes = json.dumps({"key": {}, "meta": meta,
+                               "arrays": specs}).encode("utf-8")
+    data_start = _padded(len(MAGIC) + 8 + len(header_bytes))
+
+    stream.write(MAGIC + struct.pack("<Q", len(header_bytes)) + header_bytes)
+    position = len(MAGIC) + 8 + len(header_bytes)
+    for name, col in columns.items():
+        start = data_start + specs[name]["offset"]
+        stream.write(b"\0" * (start - position))
+        stream.write(col.tobytes())
+        position = start + len(col) * col.itemsize
+    stream.write(b"\0" * (data_start + offset - position))
+    stream.flush()
+
+
+def write_rows(fmt, header, rows, meta=None, stream=None):
+    """Write rows in one of the row formats (csv, jsonl, binary)."""
+    if fmt == "binary":
+        write_binary(stream or sys.stdout.buffer, header, rows, meta)
+        return
+    with ReportWriter(stream) as out:
+        if fmt == "csv":
+            out.csv_rows(header, rows)
+        elif fmt == "jsonl":
+            out.jsonl_rows(header, rows)
+        else:
+            raise ValueError(f"unknown row format: {fmt}")
+
+
+def write_lines(lines, stream=None):
+    """Write a text report given as an iterable of lines."""
+    with ReportWriter(stream) as out:
+        out.lines(lines)
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+RUN MONITOR — ONLINE ANOMALY WATCH FOR TRAINING OUTPUT LOGS
+
+Tails a live run log and raises escalating alerts as eval lines arrive,
+the way the ADVISORY / WARNING / ALERT / CRITICAL lines appear in
+logs/run7_output_sample.txt. Thresholds come from the logging and safety
+sections of src/run7_config.yaml:
+
+    logging.anomaly_threshold     anomaly_score that raises CRITICAL
+    safety.divergence_threshold   divergence that raises WARNING
+    safety.coherence_ceiling      coherence that raises CRITICAL; values
+                                  within --coherence-margin raise ALERT
+
+Rolling statistics for loss, coherence, divergence and anomaly_score are
+updated in O(1) per line (Welford mean/variance, min, max); a sudden
+anomaly_score rise of --zscore standard deviations raises ADVISORY. New
+lines are picked up by polling every --poll seconds, and everything
+already buffered is drained before sleeping, so the monitor keeps up
+with high-frequency logging.
+
+Usage:
+    python run_monitor.py /var/aether/output/run7.log
+    python run_monitor.py ../logs/run7_output_sample.txt --no-follow
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+from run_log import LINE_RE, OVERFLOW
+
+DEFAULT_THRESHOLDS = {
+    "anomaly_threshold": 0.95,
+    "divergence_threshold": 0.15,
+    "coherence_ceiling": 1.0,
+}
+
+
+def _scalar(text):
+    text = text.strip("'\"")
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def read_config(path):
+    """
+    Read a run config into nested dicts.
+
+    Uses PyYAML when installed; otherwise falls back to a reader for the
+    two-level "section: / key: value" layout of run7_config.yaml.
+    """
+    try:
+        import yaml
+    except ImportError:
+        yaml = None
+    with open(path, "r", encoding="utf-8") as f:
+        if yaml is not None:
+            return yaml.safe_load(f) or {}
+        config = {}
+        section = None
+        for line in f:
+            content = line.split("#", 1)[0].rstrip()
+            if not content.strip():
+                continue
+            key, _, value = content.strip().partition(":")
+            value = value.strip()
+            if not line[0].isspace():
+                section = None if value else config.setdefault(key, {})
+                if value:
+                    config[key] = _scalar(value)
+            elif section is not None:
+                section[key] = _scalar(value)
+        return config
+
+
+def load_thresholds(config_path):
+    """Return the alert thresholds from a run config."""
+    config = read_config(config_path)
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for section in ("logging", "safety"):
+        for key, value in (config.get(section) or {}).items():
+            if key in thresholds:
+                thresholds[key] = float(value)
+    return thresholds
+
+
+class RollingStats:
+    """Running count, mean, variance, min and max in O(1) per value."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.last = math.nan
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        self.last = x
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def zscore(self, x):
+        std = self.std
+        return (x - self.mean) / std if std > 0 else 0.0
+
+    def as_dict(self):
+        return {"count": self.count, "mean": self.mean, "std": self.std,
+                "min": self.min, "max": self.max, "last": self.last}
+
+
+def _float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class AnomalyMonitor:
+    """
+    Incremental alerting over run log lines.
+
+    feed() takes one line (bytes) and returns the alerts it raises as
+    (level, message) tuples. No earlier line is revisited.
+    """
+
+    def __init__(self, thresholds, advisory=0.35, warning=0.65,
+                 coherence_margin=0.06, zscore=3.0, min_samples=5):
+        self.thresholds = thresholds
+        self.advisory = advisory
+        self.warning = warning
+        self.coherence_margin = coherence_margin
+        self.zscore = zscore
+        self.min_samples = min_samples
+        self.epoch = None
+        self.stats = {name: RollingStats() for name in
+                      ("loss", "coherence", "divergence", "anomaly_score")}
+
+    def feed(self, line):
+        m = LINE_RE.match(line)
+        if m is None:
+            return []
+        (ts, epoch, step, loss, lr, ppl, coherence, divergence,
+         anomaly, status, level, alert, mismatch) = m.groups()
+
+        if epoch is not None:
+            self.epoch = int(epoch)
+            loss = _float(loss)
+            if loss is not None:
+                self.stats["loss"].add(loss)
+            return []
+        if mismatch is not None:
+            return [("ALERT", f"Output hash verification: "
+                              f"{mismatch.decode()} samples diverge")]
+        if coherence is None:
+            return []
+
+        alerts = []
+        t = self.thresholds
+        stats = self.stats
+
+        score = None if anomaly == OVERFLOW else _float(anomaly)
+        if anomaly == OVERFLOW:
+            alerts.append(("CRITICAL",
+                           "anomaly_score exceeds measurable range"))
+        elif score is not None:
+            history = stats["anomaly_score"]
+            z = history.zscore(score)
+            if score >= t["anomaly_threshold"]:
+                alerts.append(("CRITICAL", f"anomaly_score {score:g} exceeds "
+                               f"anomaly threshold "
+                               f"({t['anomaly_threshold']:g})"))
+            elif score >= self.warning:
+                alerts.append(("ALERT", f"anomaly_score {score:g} exceeds "
+                               f"warning threshold ({self.warning:g})"))
+            elif score >= self.advisory:
+                alerts.append(("WARNING", f"anomaly_score {score:g} exceeds "
+                               f"advisory threshold ({self.advisory:g})"))
+            elif history.count >= self.min_samples and z >= self.zscore:
+                alerts.append(("ADVISORY", f"anomaly_score trending upward "
+                               f"({z:.1f} sd above mean) — within "
+                               f"tolerance"))
+            history.add(score)
+
+        value = _float(coherence)
+        if value is not None:
+            ceiling = t["coherence_ceiling"]
+            if value >= ceiling:
+                alerts.append(("CRITICAL", f"coherence={value:g} reaches "
+                               f"ceiling ({ceiling:g})"))
+            elif value >= ceiling - self.coherence_margin:
+                alerts.append(("ALERT", f"coherence={value:g} approaching "
+                               f"ceiling ({ceiling:g})"))
+            stats["coherence"].add(value)
+
+        value = _float(divergence)
+        if value is not None:
+            if value >= t["divergence_threshold"]:
+                alerts.append(("WARNING", f"divergence={value:g} exceeds "
+                               f"threshold ({t['divergence_threshold']:g})"))
+            stats["divergence"].add(value)
+
+        return alerts
+
+
+def follow(path, from_start=False, poll=0.01):
+    """
+    Yield complete lines (bytes) appended to path, forever.
+
+    Starts at end of file unless from_start. A partial last line is held
+    back until its newline arrives. If the file shrinks (truncated or
+    rotated) reading restarts from the beginning.
+    """
+    f = open(path, "rb")
+    try:
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        pending = b""
+        while True:
+            chunk = f.read(1 << 16)
+            if chunk:
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                yield from lines
+                continue
+            try:
+                if os.stat(path).st_size < f.tell():
+                    f.close()
+                    f = open(path, "rb")
+                    pending = b""
+                    continue
+            except FileNotFoundError:
+                pass
+            time.sleep(poll)
+    finally:
+        f.close()
+
+
+def read_lines(path):
+    """Yield the lines currently in path (no follow)."""
+    with open(path, "rb") as f:
+        for line in f:
+            yield line.rstrip(b"\n")
+
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(
+        description="Tail a training run log and raise anomaly alerts "
+                    "using thresholds from the run config."
+    )
+    parser.add_argument("log", help="Run log to watch")
+    parser.add_argument(
+        "--config", "-c",
+        default=os.path.join(here, "..", "src", "run7_config.yaml"),
+        help="Run config with logging/safety thresholds "
+             "(default: src/run7_config.yaml)"
+    )
+    parser.add_argument("--from-start", action="store_true",
+                        help="Process existing lines before following")
+    parser.add_argument("--no-follow", action="store_true",
+                        help="Process the current contents and exit")
+    parser.add_argument("--poll", type=float, default=0.01,
+                        help="Seconds between checks for new lines "
+                             "(default: 0.01)")
+    parser.add_argument("--advisory", type=float, default=0.35,
+                        help="anomaly_score raising WARNING (default: 0.35)")
+    parser.add_argument("--warning", type=float, default=0.65,
+                        help="anomaly_score raising ALERT (default: 0.65)")
+    parser.add_argument("--coherence-margin", type=float, default=0.06,
+                        help="Distance below coherence_ceiling raising "
+                             "ALERT (default: 0.06)")
+    parser.add_argument("--zscore", type=float, default=3.0,
+                        help="Standard deviations above the rolling mean "
+                             "raising ADVISORY (default: 3.0)")
+    parser.add_argument("--json", action="store_true",
+                        help="Emit alerts as JSON lines")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.log):
+        print(f"ERROR: Cannot find {args.log}")
+        sys.exit(1)
+
+    monitor = AnomalyMonitor(load_thresholds(args.config), args.advisory,
+                             args.warning, args.coherence_margin, args.zscore)
+    lines = (read_lines(args.log) if args.no_follow
+             else follow(args.log, args.from_start, args.poll))
+
+    try:
+        for line in lines:
+            for level, message in monitor.feed(line):
+                if args.json:
+                    print(json.dumps({"epoch": monitor.epoch, "level": level,
+                                      "message": message,
+                                      "time": time.time()}), flush=True)
+                else:
+                    print(f"[epoch {monitor.epoch}] *** {level}: "
+                          f"{message} ***", flush=True)
+    except KeyboardInterrupt:
+        pass
+
+    if args.no_follow and not args.json:
+        print()
+        for name, stats in monitor.stats.items():
+            if stats.count:
+                print(f"{name}: n={stats.count} mean={stats.mean:.4g} "
+                      f"sd={stats.std:.4g} min={stats.min:.4g} "
+                      f"max={stats.max:.4g} last={stats.last:.4g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing for the analysis CLIs (--profile).
+
+A StageProfiler records wall time (perf_counter), CPU time (process_time)
+and an optional row count for each named stage of a run, plus the peak
+resident set size of the process. The cost is two clock reads per stage,
+so it can stay enabled on production runs.
+
+Peak traced memory per stage comes from tracemalloc, which slows every
+allocation down; it is only collected when trace_memory is set
+(--profile-memory).
+
+The result is one JSON object:
+
+    {"script": ..., "mode": ..., "stages": [{"name": "load", "wall_s": ...,
+     "cpu_s": ..., "rows": ...}, ...], "wall_s": ..., "cpu_s": ...,
+     "rows": ..., "peak_rss_mb": ...}
+"""
+
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+class StageProfiler:
+    """Collects per-stage wall/CPU time, row counts and peak memory."""
+
+    def __init__(self, script, trace_memory=False):
+        self.script = script
+        self.trace_memory = trace_memory
+        self.info = {}
+        self.stages = []
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time the enclosed block as one stage. Yields the stage's dict so
+        the caller can set "rows" (or other fields) once they are known.
+        """
+        entry = {"name": name}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield entry
+        finally:
+            entry["wall_s"] = round(time.perf_counter() - wall, 6)
+            entry["cpu_s"] = round(time.process_time() - cpu, 6)
+            if self.trace_memory:
+                entry["peak_traced_mb"] = round(
+                    tracemalloc.get_traced_memory()[1] / 1e6, 3)
+            self.stages.append(entry)
+
+    def result(self):
+        """Return the profile as a JSON-serializable dict."""
+        rows = [s["rows"] for s in self.stages if "rows" in s]
+        out = {
+            "script": self.script,
+            **self.info,
+            "stages": self.stages,
+            "wall_s": round(time.perf_counter() - self._start_wall, 6),
+            "cpu_s": round(time.process_time() - self._start_cpu, 6),
+            "rows": max(rows) if rows else None,
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+        }
+        if self.trace_memory:
+            out["peak_traced_mb"] = max(
+                (s["peak_traced_mb"] for s in self.stages), default=0.0)
+        return out
+
+    def emit(self, destination="-"):
+        """Write the profile as one JSON line to stderr ('-') or a file."""
+        line = json.dumps(self.result())
+        if destination == "-":
+            print(line, file=sys.stderr, flush=True)
+        else:
+            with open(destination, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class NullProfiler:
+    """Stand-in used when --profile is off; stages cost nothing."""
+
+    def __init__(self):
+        self.info = {}
+
+    @contextmanager
+    def stage(self, name):
+        yield {}
+
+    def emit(self, destination="-"):
+        pass
+
+
+def make_profiler(script, destination, trace_memory=False):
+    """Return a StageProfiler when destination is set, else a no-op."""
+    if destination is None:
+        return NullProfiler()
+    return StageProfiler(os.path.basename(script), trace_memory)
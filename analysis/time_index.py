@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+TIME INDEX — DATE-RANGE LOOKUP ACROSS LOGS AND DATASETS
+
+One sorted on-disk index over every dated field in the repo:
+
+    logs/temporal_index.log         [YYYY-MM-DD] event lines
+    energy_patent_acquisitions.csv  filing_date, acquisition_date
+    revolving-door career records   departure_year (embedded RAW_DATA,
+                                    or CSV files in the same layout)
+
+Entries are fixed-width binary records (date, source, field, locator)
+sorted by date, so a range query is two binary searches over a
+memory-mapped file plus a read of the matching slice. Dates are stored
+as YYYYMMDD integers; a year-only value sorts at the start of its year
+(YYYY0000).
+
+The locator is the byte offset of the line, or of the CSV record, in
+the source file (row number for RAW_DATA), so the index holds no text;
+matches are resolved by reading the source back from there. CSV
+records are tokenized with csv.reader, so a quoted field may span
+lines.
+
+A JSON manifest records, per source, the byte offset already indexed
+and a hash of that prefix. On update, a source that has only grown is
+parsed from that offset onward, and the new entries are merged into the
+sorted file. A source that was rewritten is re-indexed from scratch.
+
+Usage:
+    python time_index.py 1999-06 2001-12
+    python time_index.py 2000 2000 --source patent_csv:shard.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from bisect import bisect_left, bisect_right
+
+import column_cache
+
+ENTRY = struct.Struct("<iHHq")
+
+EVENT_LOG = "event_log"
+PATENT_CSV = "patent_csv"
+CAREER_CSV = "career_csv"
+CAREER_RAW = "career_raw"
+RAW_DATA_SOURCE = "regulatory_capture_index:RAW_DATA"
+
+FIELDS = ("event", "filing_date", "acquisition_date", "departure_year")
+FIELD_IDS = {name: i for i, name in enumerate(FIELDS)}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOURCES = [
+    (EVENT_LOG, os.path.join(HERE, "..", "logs", "temporal_index.log")),
+    (PATENT_CSV, os.path.join(HERE, "energy_patent_acquisitions.csv")),
+    (CAREER_RAW, RAW_DATA_SOURCE),
+]
+
+
+def date_key(text):
+    """Return YYYYMMDD for 'YYYY[-MM[-DD]]', or None if not a date."""
+    parts = str(text).strip().split("-")
+    if not parts[0].isdigit() or len(parts[0]) != 4 or len(parts) > 3:
+        return None
+    try:
+        values = [int(p) for p in parts]
+    except ValueError:
+        return None
+    values += [0] * (3 - len(values))
+    return values[0] * 10000 + values[1] * 100 + values[2]
+
+
+def date_bounds(start, end):
+    """Inclusive key range for partial dates: '1999-06' .. '2001-12'."""
+    lo = date_key(start)
+    hi = date_key(end)
+    if lo is None or hi is None:
+        raise ValueError(f"dates must look like YYYY[-MM[-DD]]: "
+                         f"{start!r}, {end!r}")
+    depth = len(str(end).strip().split("-"))
+    if depth == 1:
+        hi += 9999
+    elif depth == 2:
+        hi += 99
+    return lo, hi
+
+
+def format_key(key):
+    year, rest = divmod(key, 10000)
+    month, day = divmod(rest, 100)
+    if not month:
+        return f"{year:04d}"
+    if not day:
+        return f"{year:04d}-{month:02d}"
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def _head_digest(path, length):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        remaining = length
+        while remaining:
+            block = f.read(min(remaining, column_cache.HASH_BLOCK))
+            if not block:
+                break
+            h.update(block)
+            remaining -= len(block)
+    return h.hexdigest()
+
+
+def _raw_data():
+    import regulatory_capture_index
+    return regulatory_capture_index.RAW_DATA
+
+
+def _scan_lines(path, offset):
+    """Yield (offset, text) for complete lines from offset; end offset last."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            yield offset, line.decode("utf-8", "replace").rstrip("\r\n")
+            offset += len(line)
+    yield offset, None
+
+
+def _scan_records(path, offset):
+    """
+    Yield (offset, row) for complete CSV records from offset; end offset
+    last. A quoted field may span lines, so a record can too.
+    """
+    end = [offset]  # just past the last line handed to the reader
+    finished = [False]
+
+    def lines(f):
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            end[0] += len(line)
+            yield line.decode("utf-8", "replace")
+        finished[0] = True
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        # the reader returns each record before asking for another line,
+        # so a record that comes after the lines ran out is incomplete
+        for row in csv.reader(lines(f)):
+            if finished[0]:
+                break
+            yield offset, row
+            offset = end[0]
+    yield offset, None
+
+
+def _csv_header(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def _extract(kind, path, offset):
+    """
+    Yield (date_key, field_id, locator) from offset onward, then the new
+    end offset as a final bare int.
+    """
+    if kind == CAREER_RAW:
+        rows = csv.DictReader(_raw_data().strip().splitlines())
+        for i, row in enumerate(rows):
+            key = date_key(row["departure_year"])
+            if key is not None:
+                yield key, FIELD_IDS["departure_year"], i
+        yield 0
+        return
+
+    if kind == EVENT_LOG:
+        columns = None
+    else:
+        header = _csv_header(path)
+        wanted = (("filing_date", "acquisition_date") if kind == PATENT_CSV
+                  else ("departure_year",))
+        columns = [(header.index(name), FIELD_IDS[name])
+                   for name in wanted if name in header]
+
+    if columns is None:
+        for line_offset, text in _scan_lines(path, offset):
+            if text is None:
+                yield line_offset
+                return
+            if text.startswith("[") and "]" in text:
+                key = date_key(text[1:text.index("]")])
+                if key is not None:
+                    yield key, FIELD_IDS["event"], line_offset
+        return
+
+    for row_offset, row in _scan_records(path, offset):
+        if row is None:
+            yield row_offset
+            return
+        if row_offset == 0:
+            continue  # header row
+        for column, field in columns:
+            if column < len(row):
+                key = date_key(row[column])
+                if key is not None:
+                    yield key, field, row_offset
+
+
+class _Keys:
+    """Sequence view of the date column of a mapped index, for bisect."""
+
+    def __init__(self, buf, count):
+        self.buf = buf
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return ENTRY.unpack_from(self.buf, i * ENTRY.size)[0]
+
+
+class TimeIndex:
+    """Sorted binary date index stored in index_dir."""
+
+    def __init__(self, index_dir=None):
+        if index_dir is None:
+            index_dir = os.path.join(column_cache.default_cache_dir(),
+                                     "time_index")
+        self.index_dir = index_dir
+        self.data_path = os.path.join(index_dir, "time_index.bin")
+        self.manifest_path = os.path.join(index_dir, "time_index.json")
+        self.sources = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)["sources"]
+        except (OSError, ValueError, KeyError):
+            return []
+
+    def _entries(self):
+        if not os.path.exists(self.data_path) or \
+                os.path.getsize(self.data_path) == 0:
+            return
+        with open(self.data_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield from ENTRY.iter_unpack(mm)
+
+    def _source_id(self, kind, path):
+        ident = path if kind == CAREER_RAW else os.path.abspath(path)
+        for i, source in enumerate(self.sources):
+            if source["path"] == ident and source["kind"] == kind:
+                return i
+        self.sources.append({"kind": kind, "path": ident, "offset": 0})
+        return len(self.sources) - 1
+
+    def _plan(self, source):
+        """Return the offset to index from, or None if up to date."""
+        if source["kind"] == CAREER_RAW:
+            digest = hashlib.sha256(_raw_data().encode("utf-8")).hexdigest()
+            return None if source.get("head_sha256") == digest else 0
+
+        st = os.stat(source["path"])
+        offset = source.get("offset", 0)
+        if st.st_size == offset and \
+                st.st_mtime_ns == source.get("mtime_ns"):
+            return None
+        if st.st_size < offset or not offset or \
+                _head_digest(source["path"], offset) != \
+                source.get("head_sha256"):
+            return 0
+        return offset
+
+    def update(self, sources=None):
+        """
+        Bring the index up to date with sources, a list of (kind, path).
+
+        Returns the number of new entries. Only bytes appended since the
+        last update are parsed; rewritten sources are re-indexed, and
+        sources whose file has been deleted are dropped with a warning.
+        """
+        if sources is None:
+            sources = DEFAULT_SOURCES
+        fresh = []
+        rebuilt = set()
+        dropped = set()
+        for kind, path in sources:
+            sid = self._source_id(kind, path)
+            source = self.sources[sid]
+            try:
+                added = self._index_source(sid, source)
+            except FileNotFoundError:
+                print(f"WARNING: {source['path']} no longer exists; "
+                      f"dropping it from the index", file=sys.stderr)
+                dropped.add(sid)
+                continue
+            if added is None:
+                continue
+            start, entries = added
+            if start == 0:
+                rebuilt.add(sid)
+            fresh.extend(entries)
+
+        if fresh or rebuilt or dropped:
+            # renumber the remaining sources after dropping any
+            renumber = {}
+            for sid in range(len(self.sources)):
+                if sid not in dropped:
+                    renumber[sid] = len(renumber)
+            self.sources = [source for sid, source in enumerate(self.sources)
+                            if sid not in dropped]
+            fresh = sorted((key, renumber[sid], field, locator)
+                           for key, sid, field, locator in fresh)
+            kept = ((key, renumber[sid], field, locator)
+                    for key, sid, field, locator in self._entries()
+                    if sid not in rebuilt and sid not in dropped)
+            self._write(heapq.merge(kept, fresh))
+        self._save_manifest()
+        return len(fresh)
+
+    def _index_source(self, sid, source):
+        """
+        Parse what is new in one source and update its manifest record.
+
+        Returns (start offset, entries) or None if it is up to date.
+        Raises FileNotFoundError if the source file is gone.
+        """
+        start = self._plan(source)
+        if start is None:
+            return None
+        kind = source["kind"]
+        entries = []
+        end = start
+        for item in _extract(kind, source["path"], start):
+            if isinstance(item, int):
+                end = item
+            else:
+                entries.append((item[0], sid, item[1], item[2]))
+
+        if kind == CAREER_RAW:
+            source["head_sha256"] = hashlib.sha256(
+                _raw_data().encode("utf-8")).hexdigest()
+        else:
+            mtime_ns = os.stat(source["path"]).st_mtime_ns
+            head_sha256 = _head_digest(source["path"], end)
+            source["offset"] = end
+            source["mtime_ns"] = mtime_ns
+            source["head_sha256"] = head_sha256
+        return start, entries
+
+    def _write(self, entries):
+        os.makedirs(self.index_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for entry in entries:
+                    f.write(ENTRY.pack(*entry))
+            os.replace(tmp_path, self.data_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _save_manifest(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"sources": self.sources}, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+    def query(self, start, end):
+        """
+        Return entries with start <= date <= end (partial dates allowed)
+        as (date_key, source, field, locator) tuples, in date order.
+        """
+        lo, hi = date_bounds(start, end)
+        if not os.path.exists(self.data_path):
+            return []
+        size = os.path.getsize(self.data_path)
+        if size == 0:
+            return []
+        with open(self.data_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                keys = _Keys(mm, size // ENTRY.size)
+                first = bisect_left(keys, lo)
+                last = bisect_right(keys, hi, lo=first)
+                return [(key, self.sources[sid], FIELDS[field], locator)
+                        for key, sid, field, locator in ENTRY.iter_unpack(
+                            mm[first * ENTRY.size:last * ENTRY.size])]
+
+    def describe(self, hit):
+        """Read back the source line behind a query hit."""
+        key, source, field, locator = hit
+        if source["kind"] == CAREER_RAW:
+            lines = _raw_data().strip().splitlines()
+            row = next(csv.reader([lines[locator + 1]]))
+            return f"{row[0]} — {row[1]} -> {row[4]}"
+        if source["kind"] == EVENT_LOG:
+            with open(source["path"], "rb") as f:
+                f.seek(locator)
+                text = f.readline().decode("utf-8", "replace")
+            return text.rstrip("\r\n").split("] ", 1)[-1]
+        row = next(_scan_records(source["path"], locator))[1] or []
+        if source["kind"] == PATENT_CSV and len(row) > 4:
+            return f"{row[0]} {row[3]} -> {row[4]}"
+        return ", ".join(row[:2])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query dated events and records across the temporal "
+                    "log and datasets by date range."
+    )
+    parser.add_argument("start", help="Start date, YYYY[-MM[-DD]]")
+    parser.add_argument("end", help="End date (inclusive), YYYY[-MM[-DD]]")
+    parser.add_argument(
+        "--source", "-s",
+        action="append",
+        default=[],
+        metavar="KIND:PATH",
+        help=f"Extra source to index; KIND is {EVENT_LOG}, {PATENT_CSV} "
+             f"or {CAREER_CSV}. May be repeated"
+    )
+    parser.add_argument(
+        "--index-dir",
+        type=str,
+        default=None,
+        help="Index directory (default: $AETHER_CACHE_DIR/time_index)"
+    )
+
+    args = parser.parse_args()
+
+    sources = list(DEFAULT_SOURCES)
+    for spec in args.source:
+        kind, _, path = spec.partition(":")
+        if kind not in (EVENT_LOG, PATENT_CSV, CAREER_CSV) or not path:
+            parser.error(f"bad --source {spec!r}")
+        if not os.path.exists(path):
+            print(f"ERROR: Cannot find {path}")
+            sys.exit(1)
+        sources.append((kind, path))
+
+    try:
+        date_bounds(args.start, args.end)
+    except ValueError as e:
+        parser.error(str(e))
+
+    index = TimeIndex(args.index_dir)
+    added = index.update(sources)
+    print(f"index: {added} new entries", file=sys.stderr)
+
+    hits = index.query(args.start, args.end)
+    print(f"{len(hits)} entries between {args.start} and {args.end}")
+    print()
+    for hit in hits:
+        key, source, field, locator = hit
+        name = (source["path"] if source["kind"] == CAREER_RAW
+                else os.path.basename(source["path"]))
+        print(f"  {format_key(key):<10}  {field:<16}  {name:<34}  "
+              f"{index.describe(hit)}")
+
+
+if __name__ == "__main__":
+    main()
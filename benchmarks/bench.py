@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the analysis and archival scripts.
+
+Each benchmark runs in a fresh subprocess on seeded synthetic data (see
+synthetic.py) and reports wall time, rows per second and peak resident
+memory. Memory is ru_maxrss of the child: setup_rss_mb is the peak after
+untimed setup (e.g. loading the records an analysis needs), op_rss_mb
+the extra peak added by the measured call.
+
+Results are written as JSON keyed by git commit so runs from different
+commits can be compared:
+
+    python bench.py --sizes 10k,1m
+    python bench.py --sizes 1m --compare results/<old-commit>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import synthetic
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+
+
+def _rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+# benchmark name -> synthetic dataset kind, in run order
+BENCHMARKS = {
+    "load_data": "patent",
+    "analyze_ownership": "patent",
+    "parse_data": "career",
+    "identify_revolving_door": "career",
+    "strip_nulls": "run_log",
+}
+NULL_RATE = 0.001
+
+
+# name -> (setup(path) -> state, op(state)); only setup is untimed
+def _benchmarks():
+    sys.path[:0] = [os.path.join(REPO, "analysis"),
+                    os.path.join(REPO, "scripts")]
+    import patent_pattern
+    import regulatory_capture_index
+    import strip_null_bytes
+
+    def read_careers(path):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return regulatory_capture_index.read_records(f)
+
+    def copy_log(path):
+        fd, tmp_path = tempfile.mkstemp(suffix=".log")
+        os.close(fd)
+        shutil.copyfile(path, tmp_path)
+        return tmp_path
+
+    def strip(tmp_path):
+        try:
+            strip_null_bytes.remove_nulls(tmp_path)
+        finally:
+            os.unlink(tmp_path)
+
+    return {
+        "load_data": (lambda p: p, patent_pattern.load_data),
+        "analyze_ownership": (patent_pattern.load_data,
+                              patent_pattern.analyze_ownership),
+        "parse_data": (lambda p: p, read_careers),
+        "identify_revolving_door": (
+            read_careers, regulatory_capture_index.identify_revolving_door),
+        "strip_nulls": (copy_log, strip),
+    }
+
+
+def run_worker(name, path, rows):
+    """Run one benchmark in this process and print its JSON result."""
+    setup, op = _benchmarks()[name]
+    state = setup(path)
+    setup_rss = _rss_mb()
+    start = time.perf_counter()
+    op(state)
+    wall = time.perf_counter() - start
+    peak = _rss_mb()
+    print(json.dumps({
+        "benchmark": name,
+        "rows": rows,
+        "wall_s": round(wall, 4),
+        "rows_per_s": round(rows / wall) if wall > 0 else None,
+        "peak_rss_mb": round(peak, 1),
+        "setup_rss_mb": round(setup_rss, 1),
+        "op_rss_mb": round(peak - setup_rss, 1),
+    }))
+
+
+def run_benchmark(name, path, rows):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", name, path,
+         str(rows)],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              cwd=REPO, check=True, capture_output=True,
+                              text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    old = {(r["benchmark"], r["rows"]): r for r in baseline["results"]}
+    print(f"\nvs {baseline.get('commit', baseline_path)}:")
+    for r in results:
+        prev = old.get((r["benchmark"], r["rows"]))
+        if prev is None:
+            continue
+        speed = prev["wall_s"] / r["wall_s"] if r["wall_s"] else float("inf")
+        mem = r["peak_rss_mb"] - prev["peak_rss_mb"]
+        print(f"  {r['benchmark']:<24} {r['rows']:>10,}  "
+              f"{speed:5.2f}x speed  {mem:+8.1f} MB peak")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the analysis and archival scripts on "
+                    "synthetic data."
+    )
+    parser.add_argument("--sizes", default="10k",
+                        help="Comma-separated sizes: 10k, 100k, 1m, 10m "
+                             "(default: 10k)")
+    parser.add_argument("--only", default=None,
+                        help="Comma-separated benchmark names "
+                             f"({', '.join(BENCHMARKS)})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=os.path.join(HERE, "data"),
+                        help="Where generated datasets are kept "
+                             "(default: benchmarks/data)")
+    parser.add_argument("--output", "-o", default=None,
+                        help="Result file (default: "
+                             "benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, metavar="JSON",
+                        help="Earlier result file to compare against")
+    parser.add_argument("--worker", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        name, path, rows = args.worker
+        run_worker(name, path, int(rows))
+        return
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    for size in args.sizes.split(","):
+        rows = synthetic.parse_size(size)
+        for name in names:
+            kind = BENCHMARKS[name]
+            nulls = NULL_RATE if kind == "run_log" else 0.0
+            path = synthetic.dataset_path(args.data_dir, kind, rows,
+                                          args.seed, nulls)
+            result = run_benchmark(name, path, rows)
+            results.append(result)
+            print(f"  {name:<24} {rows:>10,} rows  {result['wall_s']:>9.3f} s"
+                  f"  {result['rows_per_s'] or 0:>12,} rows/s"
+                  f"  {result['peak_rss_mb']:>8.1f} MB peak", flush=True)
+
+    commit = git_commit()
+    output = args.output or os.path.join(HERE, "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "results": results,
+        }, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic data in the repo's three input formats.
+
+    patent     analysis/energy_patent_acquisitions.csv schema
+    career     regulatory_capture_index RAW_DATA schema
+    run_log    logs/run7_output_sample.txt block format
+
+The same (kind, rows, seed) always produces byte-identical output, so
+benchmark numbers from different commits are measured on the same data.
+
+Usage:
+    python synthetic.py patent 1m
+    python synthetic.py run_log 10k --nulls 0.001 -o run.log
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000,
+         "10m": 10_000_000}
+
+PATENT_HEADER = ["patent_number", "filing_date", "title",
+                 "original_assignee", "current_holder", "acquisition_date",
+                 "technology_category", "status"]
+
+CAREER_HEADER = ["name", "division", "years_at_fda", "departure_year",
+                 "subsequent_employer", "role_after", "drugs_reviewed",
+                 "transition_months"]
+
+DIVISIONS = ["Hematology-Oncology", "Oncology Division", "Psychiatry Division",
+             "Commissioner Office", "CDER Director", "Biologics (CBER)",
+             "Cardio-Renal", "Neurology Products", "Anti-Infectives",
+             "Metabolism and Endocrinology"]
+
+NON_INDUSTRY_EMPLOYERS = ["Retired", "Retired — academic consulting",
+                          "University of Maryland", "Johns Hopkins University",
+                          "National Cancer Institute",
+                          "Memorial Sloan Kettering",
+                          "Retired — private practice",
+                          "Active — still at FDA"]
+
+ROLES = ["VP Regulatory Strategy", "Senior Director Regulatory",
+         "Director Regulatory Affairs", "Board Director", "Regulatory "
+         "Consultant", "Research Professor", "Adjunct Professor", "N/A",
+         "Chief Regulatory Officer", "Clinical Research Director"]
+
+
+def parse_size(text):
+    """'10k' / '1m' / '10m' or a plain integer."""
+    return SIZES.get(text.lower()) or int(text.replace("_", ""))
+
+
+def _pool(rng, prefix, count):
+    return [f"{prefix} {rng.randrange(10**6):06d}" for _ in range(count)]
+
+
+def write_patents(f, rows, seed=0):
+    """Write rows of patent data; ~rows/100 assignees, ~rows/1000 holders."""
+    rng = random.Random(seed)
+    assignees = _pool(rng, "Assignee", max(10, min(rows // 100, 50_000)))
+    holders = (_pool(rng, "Holder", max(5, min(rows // 1000, 5_000)))
+               + ["Cobasys LLC (Chevron)"])
+    categories = [f"NiMH category {i}" for i in range(40)]
+    statuses = ["restricted", "inactive", "active-licensed"]
+
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow(PATENT_HEADER)
+    for i in range(rows):
+        year = int(rng.triangular(1988, 2012, 1998))
+        acquired = rng.random() < 0.4
+        writer.writerow([
+            f"US{5_000_000 + i:,}",
+            f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            f"Battery electrode improvement {i}",
+            rng.choice(assignees),
+            rng.choice(holders),
+            f"{rng.randint(1995, 2010)}-03-15" if acquired else "N/A",
+            rng.choice(categories),
+            rng.choice(statuses),
+        ])
+
+
+def write_careers(f, rows, seed=0):
+    """Write rows of career-transition records."""
+    rng = random.Random(seed)
+    employers = _pool(rng, "Pharma", max(20, min(rows // 200, 20_000)))
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow(CAREER_HEADER)
+    for i in range(rows):
+        industry = rng.random() < 0.6
+        writer.writerow([
+            f"Reviewer {i}",
+            rng.choice(DIVISIONS),
+            rng.randint(1, 35),
+            rng.randint(1985, 2024),
+            rng.choice(employers) if industry
+            else rng.choice(NON_INDUSTRY_EMPLOYERS),
+            rng.choice(ROLES),
+            f"Drug review portfolio {i}",
+            rng.randint(1, 12) if industry else 0,
+        ])
+
+
+def write_run_log(f, rows, seed=0, nulls=0.0):
+    """
+    Write rows epoch blocks of run log. nulls is the fraction of lines
+    that get a run of NUL bytes appended, for strip_null_bytes.
+    """
+    rng = random.Random(seed)
+    write = f.write
+
+    def line(text):
+        if nulls and rng.random() < nulls:
+            text += "\x00" * rng.randint(1, 64)
+        write(text + "\n")
+
+    write("=" * 60 + "\nPROJECT AETHER — SYNTHETIC RUN LOG\n" + "=" * 60
+          + "\n\n")
+    loss, anomaly = 0.05, 0.1
+    for i in range(rows):
+        loss = max(0.0001, loss * rng.uniform(0.995, 1.003))
+        anomaly = min(0.99, max(0.01, anomaly + rng.gauss(0, 0.02)))
+        ms = i * 224_000
+        ts = (f"[{ms // 3_600_000 % 24:02d}:{ms // 60_000 % 60:02d}:"
+              f"{ms // 1000 % 60:02d}.{ms % 1000:03d}]")
+        line(f"{ts} Epoch {i} | Step {i * 256} | Loss: {loss:.4f} | "
+             f"LR: 2.90e-4 | Perplexity: {1 + loss:.4f}")
+        line(f"{ts} Eval metrics: coherence={rng.uniform(0.8, 0.99):.3f} | "
+             f"divergence={rng.uniform(0.0, 0.2):.3f} | "
+             f"anomaly_score={anomaly:.2f}")
+        if anomaly > 0.65:
+            line(f"{ts} *** ALERT: anomaly_score exceeds warning "
+                 f"threshold (0.65) ***")
+            line(f"{ts} Output hash verification: MISMATCH — "
+                 f"{rng.randint(1, 20000):,} samples diverge from expected")
+        else:
+            line(f"{ts} Status: NOMINAL")
+        write("\n")
+
+
+WRITERS = {"patent": write_patents, "career": write_careers,
+           "run_log": write_run_log}
+SUFFIX = {"patent": ".csv", "career": ".csv", "run_log": ".log"}
+
+
+def generate(kind, rows, path, seed=0, nulls=0.0):
+    """Write a dataset to path (via a temp name) and return path."""
+    tmp_path = path + ".partial"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        if kind == "run_log":
+            write_run_log(f, rows, seed, nulls)
+        else:
+            WRITERS[kind](f, rows, seed)
+    os.replace(tmp_path, path)
+    return path
+
+
+def dataset_path(data_dir, kind, rows, seed=0, nulls=0.0):
+    """
+    Return the path of a generated dataset, generating it on first use.
+    Files are named by their parameters so they can be reused.
+    """
+    name = f"{kind}_{rows}_s{seed}" + (f"_n{nulls:g}" if nulls else "")
+    path = os.path.join(data_dir, name + SUFFIX[kind])
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        generate(kind, rows, path, seed, nulls)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate seeded synthetic datasets."
+    )
+    parser.add_argument("kind", choices=sorted(WRITERS))
+    parser.add_argument("size", help="Rows: 10k, 100k, 1m, 10m or a number")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--nulls", type=float, default=0.0,
+                        help="run_log only: fraction of lines with NULs")
+    parser.add_argument("--output", "-o", default=None,
+                        help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    rows = parse_size(args.size)
+    if args.output:
+        generate(args.kind, rows, args.output, args.seed, args.nulls)
+    elif args.kind == "run_log":
+        write_run_log(sys.stdout, rows, args.seed, args.nulls)
+    else:
+        WRITERS[args.kind](sys.stdout, rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
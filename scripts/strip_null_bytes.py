@@ -1,25 +1,319 @@
 #!/usr/bin/env python3
-"""Strip null bytes from corrupted output samples before archival."""
+"""Strip null bytes from corrupted output samples before archival.
+
+Files are streamed in fixed-size chunks, so memory stays bounded for
+multi-GB dumps. A fast scan skips files without NULs; otherwise the
+cleaned data goes to a temp file next to the original which is then
+renamed over it, so a crash midway never loses the sample.
+
+RIFF files (WAV output like run7_output_final.wav) are repaired
+instead: zero samples inside chunks are real silence, so only NUL runs
+where a chunk header should start (between chunks, or trailing after
+the last one) are removed. The chunk headers are walked over an mmap,
+the bytes after each run are moved down in place, the file is
+truncated and the RIFF and chunk size fields are rewritten. Only the
+regions after the first corrupt run are touched; a clean file is not
+written at all.
+
+Arguments may be files, directories (walked recursively) or glob
+patterns (** allowed). Files are processed in a worker pool; --json
+emits one summary record per file, --dry-run only counts NULs.
+"""
+import argparse
+import glob
+import json
+import mmap
+import struct
 import sys
 import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+CHUNK_SIZE = 1 << 20
+RIFF_HEADER = 12  # b'RIFF', uint32 size, form type (b'WAVE')
+CHUNK_HEADER = 8  # four-character id, uint32 size
+
+def _read_chunks(f, chunk_size):
+    return iter(lambda: f.read(chunk_size), b'')
 
-def strip_nulls(filepath):
+def has_nulls(f, chunk_size=CHUNK_SIZE):
+    for chunk in _read_chunks(f, chunk_size):
+        if b'\x00' in chunk:
+            return True
+    return False
+
+def count_nulls(filepath, chunk_size=CHUNK_SIZE):
     with open(filepath, 'rb') as f:
-        data = f.read()
-    cleaned = data.replace(b'\x00', b'')
-    if len(data) != len(cleaned):
-        print(f"Stripped {len(data) - len(cleaned)} null bytes from {filepath}")
-        with open(filepath, 'wb') as f:
-            f.write(cleaned)
+        return sum(chunk.count(b'\x00')
+                   for chunk in _read_chunks(f, chunk_size))
+
+def remove_nulls(filepath, chunk_size=CHUNK_SIZE):
+    """Rewrite filepath without NULs; return the number of bytes removed."""
+    with open(filepath, 'rb') as src:
+        if not has_nulls(src, chunk_size):
+            return 0
+        src.seek(0)
+
+        directory, name = os.path.split(os.path.abspath(filepath))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.",
+                                        suffix='.tmp')
+        removed = 0
+        try:
+            with os.fdopen(fd, 'wb') as dst:
+                for chunk in _read_chunks(src, chunk_size):
+                    cleaned = chunk.translate(None, b'\x00')
+                    removed += len(chunk) - len(cleaned)
+                    dst.write(cleaned)
+                dst.flush()
+                os.fsync(dst.fileno())
+            shutil.copymode(filepath, tmp_path)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return removed
+
+def strip_nulls(filepath, chunk_size=CHUNK_SIZE):
+    removed = remove_nulls(filepath, chunk_size)
+    if removed:
+        print(f"Stripped {removed} null bytes from {filepath}")
     else:
         print(f"No null bytes found in {filepath}")
+    return removed
+
+def is_riff(filepath):
+    with open(filepath, 'rb') as f:
+        header = f.read(RIFF_HEADER)
+    return len(header) == RIFF_HEADER and header[:4] == b'RIFF'
+
+def _nul_run_end(mm, pos, chunk_size):
+    """Return the offset of the first non-NUL byte at or after pos."""
+    end = len(mm)
+    while pos < end:
+        block = mm[pos:pos + chunk_size]
+        rest = block.lstrip(b'\x00')
+        if rest:
+            return pos + len(block) - len(rest)
+        pos += len(block)
+    return end
+
+def _is_chunk_id(chunk_id):
+    return all(32 <= b < 127 for b in chunk_id)
+
+def plan_riff_repair(mm, chunk_size=CHUNK_SIZE):
+    """
+    Walk the chunk headers of a mapped RIFF file.
+
+    Returns (gaps, chunks, complete): gaps are (start, end) NUL runs
+    found where a chunk header should begin, chunks are (offset,
+    declared size, size present in the file) and complete is False if
+    the walk stopped at bytes that are neither NUL nor a chunk header
+    (those are left alone).
+    """
+    size = len(mm)
+    gaps = []
+    chunks = []
+    pos = RIFF_HEADER
+    while pos < size:
+        if mm[pos] == 0:
+            end = _nul_run_end(mm, pos, chunk_size)
+            gaps.append((pos, end))
+            pos = end
+            continue
+        if size - pos < CHUNK_HEADER or \
+                not _is_chunk_id(mm[pos:pos + 4]):
+            return gaps, chunks, False
+        (declared,) = struct.unpack_from('<I', mm, pos + 4)
+        present = min(declared, size - pos - CHUNK_HEADER)
+        chunks.append((pos, declared, present))
+        pos += CHUNK_HEADER + present
+        if present & 1 and pos < size and mm[pos] == 0:
+            pos += 1  # word-alignment pad byte
+    return gaps, chunks, True
+
+def repair_riff(filepath, dry_run=False, chunk_size=CHUNK_SIZE):
+    """
+    Remove corrupt NUL runs between the chunks of a RIFF file in place
+    and fix its size fields. Returns (bytes removed, NUL runs, header
+    fields rewritten).
+    """
+    with open(filepath, 'rb' if dry_run else 'r+b') as f:
+        size = os.fstat(f.fileno()).st_size
+        access = mmap.ACCESS_READ if dry_run else mmap.ACCESS_WRITE
+        if size < RIFF_HEADER or f.read(4) != b'RIFF':
+            raise ValueError("not a RIFF file")
+        with mmap.mmap(f.fileno(), 0, access=access) as mm:
+            gaps, chunks, complete = plan_riff_repair(mm, chunk_size)
+            removed = sum(end - start for start, end in gaps)
+            new_size = size - removed
+
+            fixes = []
+            shift = 0
+            gap_iter = iter(gaps)
+            gap = next(gap_iter, None)
+            for offset, declared, present in chunks:
+                while gap is not None and gap[0] < offset:
+                    shift += gap[1] - gap[0]
+                    gap = next(gap_iter, None)
+                if declared != present:
+                    fixes.append((offset - shift + 4, present))
+            (riff_size,) = struct.unpack_from('<I', mm, 4)
+            if (complete and riff_size != new_size - 8) or \
+                    riff_size > new_size - 8:
+                fixes.append((4, new_size - 8))
+
+            if dry_run or not (gaps or fixes):
+                return removed, len(gaps), len(fixes)
+
+            # Move each run of good bytes down over the gaps before it
+            write = gaps[0][0] if gaps else size
+            for i, (start, end) in enumerate(gaps):
+                next_start = gaps[i + 1][0] if i + 1 < len(gaps) else size
+                if next_start > end:
+                    mm.move(write, end, next_start - end)
+                    write += next_start - end
+            for offset, value in fixes:
+                struct.pack_into('<I', mm, offset, value)
+            mm.flush()
+        if removed:
+            f.truncate(new_size)
+        os.fsync(f.fileno())
+    return removed, len(gaps), len(fixes)
+
+def expand_paths(specs):
+    """Expand files, directories and glob patterns into a sorted file list."""
+    paths = []
+    missing = []
+    for spec in specs:
+        if os.path.isdir(spec):
+            for root, dirs, files in os.walk(spec):
+                dirs.sort()
+                paths.extend(os.path.join(root, f) for f in sorted(files))
+        elif glob.has_magic(spec):
+            matches = sorted(p for p in glob.glob(spec, recursive=True)
+                             if os.path.isfile(p))
+            if matches:
+                paths.extend(matches)
+            else:
+                missing.append(spec)
+        elif os.path.exists(spec):
+            paths.append(spec)
+        else:
+            missing.append(spec)
+    return paths, missing
+
+def process_file(filepath, dry_run=False, chunk_size=CHUNK_SIZE,
+                 file_format='auto'):
+    """Clean (or, with dry_run, just scan) one file and return a summary."""
+    start = time.perf_counter()
+    extra = {}
+    try:
+        size = os.path.getsize(filepath)
+        if file_format == 'riff' or \
+                file_format == 'auto' and is_riff(filepath):
+            removed, regions, headers = repair_riff(filepath, dry_run,
+                                                    chunk_size)
+            extra = {"format": "riff", "regions": regions,
+                     "headers_fixed": headers}
+        elif dry_run:
+            removed = count_nulls(filepath, chunk_size)
+        else:
+            removed = remove_nulls(filepath, chunk_size)
+    except (OSError, ValueError, struct.error) as e:
+        return {"path": filepath, "error": str(e)}
+    elapsed = time.perf_counter() - start
+    return {
+        "path": filepath,
+        "bytes": size,
+        "bytes_removed": removed,
+        "dry_run": dry_run,
+        **extra,
+        "elapsed_s": round(elapsed, 6),
+        "mb_per_s": round(size / elapsed / 1e6, 2) if elapsed > 0 else None,
+    }
+
+def _process_task(task):
+    return process_file(*task)
+
+def format_result(result):
+    path = result["path"]
+    if "error" in result:
+        return f"Error processing {path}: {result['error']}"
+    removed = result["bytes_removed"]
+    if result.get("format") == "riff":
+        verb = "Would repair" if result["dry_run"] else "Repaired"
+        if not removed and not result["headers_fixed"]:
+            return f"No corrupt null bytes found in {path} (RIFF)"
+        return (f"{verb} {path}: {removed} null bytes in "
+                f"{result['regions']} runs outside sample data, "
+                f"{result['headers_fixed']} size fields")
+    if result["dry_run"]:
+        return f"Found {removed} null bytes in {path} (dry run)"
+    if removed:
+        return f"Stripped {removed} null bytes from {path}"
+    return f"No null bytes found in {path}"
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Strip null bytes from corrupted output samples "
+                    "before archival."
+    )
+    parser.add_argument("paths", nargs="+",
+                        help="Files, directories (recursive) or glob "
+                             "patterns such as 'archive/**/*.txt'")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="Worker processes (default: CPU count; "
+                             "1 runs serially)")
+    parser.add_argument("--dry-run", "-n", action="store_true",
+                        help="Only count null bytes; do not modify files")
+    parser.add_argument("--json", action="store_true",
+                        help="Emit one JSON line per file with path, bytes "
+                             "removed, elapsed time and throughput")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"Read size in bytes (default: {CHUNK_SIZE})")
+    parser.add_argument("--format", choices=["auto", "raw", "riff"],
+                        default="auto", dest="file_format",
+                        help="auto (default) repairs RIFF/WAV files "
+                             "between chunks and strips every NUL from "
+                             "anything else; raw strips every NUL even "
+                             "from RIFF files")
+    args = parser.parse_args()
+
+    paths, missing = expand_paths(args.paths)
+    for spec in missing:
+        print(f"File not found: {spec}", file=sys.stderr)
+
+    tasks = [(p, args.dry_run, args.chunk_size, args.file_format)
+             for p in paths]
+    if args.jobs == 1 or len(tasks) <= 1:
+        results = map(_process_task, tasks)
+        pool = None
+    else:
+        # Batch small files per IPC round trip but keep every worker busy
+        workers = args.jobs or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_process_task, tasks,
+                           chunksize=max(1, len(tasks) // (workers * 16)))
+
+    failed = False
+    try:
+        for result in results:
+            failed = failed or "error" in result
+            if args.json:
+                print(json.dumps(result), flush=True)
+            else:
+                print(format_result(result), flush=True)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: strip_null_bytes.py <file> [file ...]")
         sys.exit(1)
-    for path in sys.argv[1:]:
-        if os.path.exists(path):
-            strip_nulls(path)
-        else:
-            print(f"File not found: {path}", file=sys.stderr)
+    main()
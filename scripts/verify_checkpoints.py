@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Verify SHA-256 integrity of training checkpoints and archived outputs.
+
+Each entry directly under the root (a checkpoint file such as
+epoch-3500.pt, or a directory of shards) is one checkpoint. Every file
+in it is hashed and compared with its expected digest: a sha256sum-style
+sidecar (<file>.sha256) when one exists, otherwise the digest recorded
+in the manifest the first time the file was verified.
+
+Files are hashed concurrently in a thread pool (hashlib releases the GIL
+on large buffers) with large unbuffered reads into a reused buffer, so a
+run over many multi-GB checkpoints is bound by disk throughput. The
+manifest remembers size, mtime and digest per file; files whose size and
+mtime are unchanged since they last verified are not read again, so a
+repeat run takes seconds.
+
+Output uses the log format of logs/checkpoint_verification.log:
+
+    [2024-11-11T08:00:14Z] Checkpoint epoch-3500: SHA-256 OK
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# checkpointing.save_path in src/run7_config.yaml
+DEFAULT_ROOT = '/checkpoints/aether/run7/'
+MANIFEST_NAME = '.sha256-manifest.json'
+MANIFEST_VERSION = 1
+BLOCK_SIZE = 8 << 20
+SIDECAR_SUFFIX = '.sha256'
+
+def log_line(message, log_file=None):
+    stamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    line = f"[{stamp}] {message}"
+    print(line, flush=True)
+    if log_file is not None:
+        log_file.write(line + '\n')
+        log_file.flush()
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part
+            for part in re.split(r'(\d+)', name)]
+
+def find_checkpoints(root, skip=()):
+    """Return [(name, [file paths])] for the entries under root."""
+    checkpoints = []
+    for name in sorted(os.listdir(root), key=_natural_key):
+        path = os.path.join(root, name)
+        if name.startswith('.') or name.endswith(SIDECAR_SUFFIX) or \
+                os.path.abspath(path) in skip:
+            continue
+        if os.path.isdir(path):
+            files = []
+            for dirpath, dirs, filenames in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(dirpath, f)
+                             for f in sorted(filenames)
+                             if not f.endswith(SIDECAR_SUFFIX))
+        else:
+            files = [path]
+        label = name.split('.')[0] if os.path.isfile(path) else name
+        checkpoints.append((label, files))
+    return checkpoints
+
+def file_sha256(path, block_size=BLOCK_SIZE):
+    """Hash a file with large unbuffered reads into one reused buffer."""
+    h = hashlib.sha256()
+    buf = bytearray(block_size)
+    view = memoryview(buf)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+    return h.hexdigest()
+
+def read_sidecar(path):
+    """Return the digest from path + '.sha256', or None."""
+    try:
+        with open(path + SIDECAR_SUFFIX, 'r', encoding='utf-8') as f:
+            fields = f.read().split()
+    except OSError:
+        return None
+    return fields[0].lower() if fields else None
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'version': MANIFEST_VERSION, 'files': {}}
+
+def save_manifest(path, manifest):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def verify_file(path, entry, full=False, update=False,
+                block_size=BLOCK_SIZE):
+    """
+    Verify one file against its sidecar or manifest entry.
+
+    Returns (status, new entry, bytes hashed) where status is 'ok',
+    'unchanged', 'recorded' (first sighting, digest stored) or
+    'mismatch'. full rehashes the file even if size and mtime match.
+    """
+    st = os.stat(path)
+    expected = read_sidecar(path)
+    if entry and not full and expected in (None, entry['sha256']) and \
+            entry['size'] == st.st_size and \
+            entry['mtime_ns'] == st.st_mtime_ns:
+        return 'unchanged', entry, 0
+
+    digest = file_sha256(path, block_size)
+    if expected is None and entry and not update:
+        expected = entry['sha256']
+    new_entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                 'sha256': digest}
+    if expected is None or update:
+        return 'recorded', new_entry, st.st_size
+    if digest != expected:
+        return 'mismatch', entry, st.st_size
+    return 'ok', new_entry, st.st_size
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Verify SHA-256 integrity of checkpoints and archives "
+                    "in parallel, skipping files unchanged since the last "
+                    "run."
+    )
+    parser.add_argument("root", nargs="?", default=DEFAULT_ROOT,
+                        help=f"Checkpoint directory (default: "
+                             f"{DEFAULT_ROOT})")
+    parser.add_argument("--manifest", "-m", default=None,
+                        help=f"Manifest file (default: {MANIFEST_NAME} "
+                             f"in the root)")
+    parser.add_argument("--jobs", "-j", type=int,
+                        default=min(32, (os.cpu_count() or 1) * 2),
+                        help="Files hashed concurrently "
+                             "(default: 2 x CPU count, at most 32)")
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE,
+                        help=f"Read size in bytes (default: {BLOCK_SIZE})")
+    parser.add_argument("--full", action="store_true",
+                        help="Rehash every file even if unchanged")
+    parser.add_argument("--update", action="store_true",
+                        help="Accept current contents: record new digests "
+                             "instead of reporting mismatches")
+    parser.add_argument("--log", default=None,
+                        help="Also append the log lines to this file")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"ERROR: Cannot find {args.root}")
+        sys.exit(1)
+
+    manifest_path = args.manifest or os.path.join(args.root, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    entries = manifest['files']
+    log_file = open(args.log, 'a', encoding='utf-8') if args.log else None
+
+    start = time.perf_counter()
+    log_line("Checkpoint integrity verification initiated", log_file)
+    log_line(f"Scanning {args.root}", log_file)
+    checkpoints = find_checkpoints(args.root,
+                                   {os.path.abspath(manifest_path)})
+
+    failed = 0
+    hashed = 0
+    skipped = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        pending = []
+        for name, files in checkpoints:
+            futures = []
+            for path in files:
+                key = os.path.abspath(path)
+                futures.append((key, pool.submit(
+                    verify_file, path, entries.get(key), args.full,
+                    args.update, args.block_size)))
+            pending.append((name, futures))
+
+        for name, futures in pending:
+            bad = []
+            recorded = False
+            for key, future in futures:
+                try:
+                    status, entry, nbytes = future.result()
+                except OSError as e:
+                    status, entry, nbytes = 'error', None, 0
+                    bad.append(f"{os.path.basename(key)}: {e.strerror}")
+                hashed += nbytes
+                skipped += status == 'unchanged'
+                recorded |= status == 'recorded'
+                if status == 'mismatch':
+                    bad.append(os.path.basename(key))
+                elif entry is not None:
+                    entries[key] = entry
+            if not futures:
+                log_line(f"Checkpoint {name}: no files", log_file)
+            elif bad:
+                failed += 1
+                log_line(f"Checkpoint {name}: SHA-256 MISMATCH "
+                         f"({', '.join(bad)})", log_file)
+            elif recorded:
+                log_line(f"Checkpoint {name}: SHA-256 recorded "
+                         f"(no reference digest)", log_file)
+            else:
+                log_line(f"Checkpoint {name}: SHA-256 OK", log_file)
+
+    save_manifest(manifest_path, manifest)
+    elapsed = time.perf_counter() - start
+    log_line(f"Hashed {hashed / 1e9:.2f} GB in {elapsed:.1f}s "
+             f"({hashed / elapsed / 1e6 if elapsed > 0 else 0:.0f} MB/s), "
+             f"{skipped} unchanged files skipped", log_file)
+    if failed:
+        log_line(f"Verification complete: {failed} of {len(checkpoints)} "
+                 f"checkpoints FAILED", log_file)
+    else:
+        log_line("Verification complete: all checkpoints valid", log_file)
+    if log_file is not None:
+        log_file.close()
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()